@@ -0,0 +1,144 @@
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ordering import sortable_value
+
+
+class HashAggregator:
+    SUPPORTED_FUNCTIONS = ('sum', 'count', 'min', 'max', 'avg')
+    NUMERIC_FUNCTIONS = ('sum', 'avg')
+
+    def __init__(self, group_by: List[str], aggregates: Dict[str, Tuple[str, str]],
+                 field_types: Optional[Dict[str, str]] = None):
+        """
+        Initialize a hash aggregate table.
+
+        Args:
+            group_by: Field names to group by
+            aggregates: Mapping of output name to (function, field); use "*" as the
+                field for count over all rows
+            field_types: Optional mapping of DBF field name to mappings.json type
+                ("number", "string", ...) used to pick accumulators
+        """
+        self.group_by = list(group_by or [])
+        self.field_types = {name.upper(): ftype for name, ftype in (field_types or {}).items()}
+        self.aggregates: List[Tuple[str, str, Optional[str], bool]] = []
+
+        for output_name, (function, field) in aggregates.items():
+            function = function.lower()
+            if function not in self.SUPPORTED_FUNCTIONS:
+                raise ValueError(f"Unsupported aggregate function '{function}' for '{output_name}'")
+            if field == '*':
+                if function != 'count':
+                    raise ValueError(f"Only count accepts '*' (got '{function}' for '{output_name}')")
+                field = None
+            numeric = self._is_numeric(field) or function in self.NUMERIC_FUNCTIONS
+            if function in self.NUMERIC_FUNCTIONS and field and field.upper() in self.field_types \
+                    and not self._is_numeric(field):
+                raise ValueError(f"Cannot {function} non numeric field '{field}'")
+            self.aggregates.append((output_name, function, field, numeric))
+
+        self.groups: Dict[Tuple[Any, ...], List[Any]] = {}
+        # Requested field name to the matching record key, resolved on the first record
+        self._record_keys: Optional[Dict[str, str]] = None
+
+    def _is_numeric(self, field: Optional[str]) -> bool:
+        """Check whether mappings.json declares the field as a number."""
+        return bool(field) and self.field_types.get(field.upper()) == 'number'
+
+    def required_fields(self) -> List[str]:
+        """Get the fields the scan has to read to feed this aggregator."""
+        fields = list(self.group_by)
+        for _, _, field, _ in self.aggregates:
+            if field and field not in fields:
+                fields.append(field)
+        return fields
+
+    @staticmethod
+    def _to_number(value: Any) -> Optional[Decimal]:
+        """Convert a converted DBF value to an exact numeric accumulator value."""
+        if value is None or value == '':
+            return None
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, float):
+            return Decimal(repr(value))
+        try:
+            return Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Value '{value}' is not numeric")
+
+    def _resolve_keys(self, record: Dict[str, Any]) -> Dict[str, str]:
+        """Match the requested field names to the record keys, ignoring case like the scan does."""
+        by_upper = {name.upper(): name for name in record}
+        names = list(self.group_by) + [field for _, _, field, _ in self.aggregates if field]
+        return {name: by_upper.get(name.upper(), name) for name in names}
+
+    @staticmethod
+    def _precedes(value: Any, current: Any, numeric: bool) -> bool:
+        """Check whether value orders before current; DD/MM/YYYY dates compare chronologically."""
+        if numeric:
+            return value < current
+        return sortable_value(value) < sortable_value(current)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Fold one record into its group's accumulators.
+
+        Args:
+            record: Record as returned by the table scan
+        """
+        if self._record_keys is None:
+            self._record_keys = self._resolve_keys(record)
+        record_keys = self._record_keys
+        key = tuple(record.get(record_keys[field]) for field in self.group_by)
+        state = self.groups.get(key)
+        if state is None:
+            # sum/count/min/max keep one slot, avg keeps [sum, count]
+            state = [[None, 0] if function == 'avg' else (0 if function == 'count' else None)
+                     for _, function, _, _ in self.aggregates]
+            self.groups[key] = state
+
+        for slot, (_, function, field, numeric) in enumerate(self.aggregates):
+            if function == 'count':
+                if field is None or record.get(record_keys[field]) is not None:
+                    state[slot] += 1
+                continue
+
+            value = record.get(record_keys[field])
+            if numeric:
+                value = self._to_number(value)
+            if value is None:
+                continue
+
+            if function == 'sum':
+                state[slot] = value if state[slot] is None else state[slot] + value
+            elif function == 'avg':
+                acc = state[slot]
+                acc[0] = value if acc[0] is None else acc[0] + value
+                acc[1] += 1
+            elif function == 'min':
+                if state[slot] is None or self._precedes(value, state[slot], numeric):
+                    state[slot] = value
+            elif function == 'max':
+                if state[slot] is None or self._precedes(state[slot], value, numeric):
+                    state[slot] = value
+
+    def results(self) -> List[Dict[str, Any]]:
+        """
+        Get the aggregated rows.
+
+        Returns:
+            List of dictionaries with the group fields and aggregate outputs; sum
+            and avg are exact Decimals, left to the serializer like raw amounts
+        """
+        rows = []
+        for key, state in self.groups.items():
+            row = dict(zip(self.group_by, key))
+            for slot, (output_name, function, _, _) in enumerate(self.aggregates):
+                value = state[slot]
+                if function == 'avg':
+                    value = value[0] / value[1] if value[1] else None
+                row[output_name] = value
+            rows.append(row)
+        return rows
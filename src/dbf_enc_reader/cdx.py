@@ -0,0 +1,401 @@
+import re
+import struct
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Iterator, Tuple, Optional, NamedTuple, Callable, BinaryIO
+
+from .dates import format_record_date, parse_date
+from .raw_reader import FieldDescriptor, JULIAN_DAY_OFFSET
+
+NODE_SIZE = 512
+HEADER_SIZE = 1024
+
+# Node attribute bits
+NODE_ROOT = 0x01
+NODE_LEAF = 0x02
+
+# Index option bits
+OPTION_UNIQUE = 0x01
+OPTION_FOR = 0x08
+
+
+# Key encodings: character keys are stored as codepage bytes, numeric and date
+# keys as big-endian doubles made byte-sortable, integer keys as big-endian
+# ints with the sign bit flipped
+KEY_CHARACTER = 'C'
+KEY_NUMERIC = 'N'
+KEY_DATE = 'D'
+KEY_INTEGER = 'I'
+
+_FIELD_KEY_TYPES = {
+    'C': KEY_CHARACTER, 'V': KEY_CHARACTER,
+    'N': KEY_NUMERIC, 'F': KEY_NUMERIC, 'B': KEY_NUMERIC,
+    'D': KEY_DATE, 'I': KEY_INTEGER,
+}
+
+_FIELD_NAME = re.compile(r'^[A-Z_][A-Z0-9_]*$')
+
+
+def key_type_for(expression: str, fields: List[FieldDescriptor]) -> Tuple[str, Optional[FieldDescriptor]]:
+    """
+    Work out how the keys of a tag are encoded from its key expression.
+
+    Tags on a single field use that field's encoding. Any other expression
+    (DTOS(), UPPER(), concatenations...) produces character keys.
+
+    Args:
+        expression: Key expression of the tag
+        fields: Field descriptors of the table
+
+    Returns:
+        Tuple of (key type, field descriptor when the tag indexes a single field)
+    """
+    name = expression.strip().upper()
+    if _FIELD_NAME.match(name):
+        for field in fields:
+            if field.name.upper() == name:
+                return _FIELD_KEY_TYPES.get(field.type, KEY_CHARACTER), field
+    return KEY_CHARACTER, None
+
+
+def key_pad(key_type: str) -> bytes:
+    """Get the byte trailing key bytes are compressed as for a key type."""
+    return b' ' if key_type == KEY_CHARACTER else b'\x00'
+
+
+def _to_date(value: Any) -> date:
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Invalid date key: {value!r}")
+    return day
+
+
+def _sortable_double(number: float) -> bytes:
+    raw = bytearray(struct.pack('>d', number))
+    if raw[0] & 0x80:
+        return bytes(b ^ 0xFF for b in raw)
+    raw[0] |= 0x80
+    return bytes(raw)
+
+
+def _from_sortable_double(raw: bytes) -> float:
+    raw = bytearray(raw)
+    if raw[0] & 0x80:
+        raw[0] &= 0x7F
+    else:
+        raw = bytearray(b ^ 0xFF for b in raw)
+    return struct.unpack('>d', bytes(raw))[0]
+
+
+def _character_key(value: Any, expression: str) -> str:
+    if expression.strip().upper().startswith('DTOS('):
+        # DTOS() keys (alone or followed by other fields) start with YYYYMMDD
+        day = parse_date(value)
+        if day is not None:
+            return day.strftime('%Y%m%d')
+    if not isinstance(value, str):
+        raise ValueError(f"Character keys need a string value, got {value!r}")
+    return value
+
+
+def encode_key(value: Any, key_type: str, key_length: int, codepage: str, expression: str = '') -> bytes:
+    """
+    Encode a value the way the index stores it, so it can be compared with raw keys.
+
+    Args:
+        value: Key value (string, number, or date as date/DD/MM/YYYY/YYYYMMDD)
+        key_type: One of the KEY_* constants
+        key_length: Key length of the tag
+        codepage: Codec of the table for character keys
+        expression: Key expression of the tag; on DTOS() tags dates are
+            encoded as YYYYMMDD
+
+    Returns:
+        Key bytes of exactly key_length bytes
+
+    Raises:
+        ValueError: If the value cannot be encoded for the key type
+    """
+    if key_type == KEY_NUMERIC:
+        raw = _sortable_double(float(value))
+    elif key_type == KEY_DATE:
+        raw = _sortable_double(float(_to_date(value).toordinal() + JULIAN_DAY_OFFSET))
+    elif key_type == KEY_INTEGER:
+        raw = struct.pack('>I', (int(value) + 0x80000000) & 0xFFFFFFFF)
+    else:
+        raw = _character_key(value, expression).encode(codepage, errors='replace')
+    return raw[:key_length].ljust(key_length, key_pad(key_type))
+
+
+def decode_key(raw: bytes, key_type: str, codepage: str, field: Optional[FieldDescriptor] = None) -> Any:
+    """
+    Decode raw key bytes to the value the raw reader would return for the field.
+
+    Args:
+        raw: Key bytes as stored in the index
+        key_type: One of the KEY_* constants
+        codepage: Codec of the table for character keys
+        field: Optional field descriptor (numeric keys of fields without decimals
+            become ints, of N/F fields with decimals Decimals)
+
+    Returns:
+        Decoded key value (dates as DD/MM/YYYY strings)
+    """
+    if key_type == KEY_NUMERIC and len(raw) >= 8:
+        number = _from_sortable_double(raw[:8])
+        if field is not None and field.type != 'B':
+            if field.decimals == 0 and number.is_integer():
+                return int(number)
+            if field.decimals > 0:
+                return Decimal(repr(number)).quantize(Decimal(1).scaleb(-field.decimals))
+        return number
+    if key_type == KEY_DATE and len(raw) >= 8:
+        julian_day = int(_from_sortable_double(raw[:8]))
+        if julian_day <= 0:
+            return None
+        return format_record_date(date.fromordinal(julian_day - JULIAN_DAY_OFFSET))
+    if key_type == KEY_INTEGER and len(raw) >= 4:
+        return struct.unpack('>I', raw[:4])[0] - 0x80000000
+    return raw.rstrip(b' \x00').decode(codepage, errors='replace')
+
+
+class CDXTag(NamedTuple):
+    name: str
+    header_offset: int
+    root: int
+    key_length: int
+    options: int
+    descending: bool
+    expression: str
+    for_expression: str
+
+    @property
+    def unique(self) -> bool:
+        return bool(self.options & OPTION_UNIQUE)
+
+
+class CDXIndex:
+    def __init__(self, path: str, opener: Optional[Callable[[str], BinaryIO]] = None):
+        """
+        Open a FoxPro compound (.CDX) index for direct reading.
+
+        Args:
+            path: Path to the .CDX file
+            opener: Optional callable opening the file for binary reading (e.g. ReadAheadFile)
+        """
+        self.path = path
+        self.file = opener(path) if opener else open(path, 'rb')
+        try:
+            directory = self._read_tag_header('', 0)
+            self.tags: Dict[str, CDXTag] = {}
+            for key, offset in self.iter_leaf_entries(directory.root, directory.key_length, b'\x00'):
+                name = key.rstrip(b'\x00 ').decode('ascii', errors='replace').upper()
+                self.tags[name] = self._read_tag_header(name, offset)
+        except Exception:
+            self.file.close()
+            raise
+
+    def _read_tag_header(self, name: str, offset: int) -> CDXTag:
+        """Parse the 1024 byte index header of a tag (or of the tag directory at offset 0)."""
+        self.file.seek(offset)
+        header = self.file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Truncated CDX header at {offset} in {self.path}")
+
+        root = struct.unpack('<i', header[0:4])[0]
+        key_length = struct.unpack('<H', header[12:14])[0]
+        options = header[14]
+        descending = struct.unpack('<H', header[502:504])[0] == 1
+        for_length, expr_length = struct.unpack('<H', header[506:508])[0], struct.unpack('<H', header[510:512])[0]
+        pool = header[512:]
+        expression = pool[:expr_length].split(b'\x00', 1)[0].decode('ascii', errors='replace').strip()
+        for_expression = ''
+        if options & OPTION_FOR and for_length:
+            for_expression = pool[expr_length:expr_length + for_length].split(b'\x00', 1)[0] \
+                .decode('ascii', errors='replace').strip()
+        return CDXTag(name, offset, root, key_length, options, descending, expression, for_expression)
+
+    def tag_names(self) -> List[str]:
+        """Get the tag names stored in the index, in directory order."""
+        return list(self.tags)
+
+    def _read_node(self, offset: int) -> bytes:
+        self.file.seek(offset)
+        node = self.file.read(NODE_SIZE)
+        if len(node) < NODE_SIZE:
+            raise ValueError(f"Truncated CDX node at {offset} in {self.path}")
+        return node
+
+    @staticmethod
+    def _parse_interior(node: bytes, key_length: int) -> List[Tuple[bytes, int, int]]:
+        """Decode an interior node into (key, record number, child offset) entries."""
+        count = struct.unpack('<H', node[2:4])[0]
+        entry_size = key_length + 8
+        entries = []
+        for i in range(count):
+            pos = 12 + i * entry_size
+            key = node[pos:pos + key_length]
+            recno, child = struct.unpack('>II', node[pos + key_length:pos + entry_size])
+            entries.append((key, recno, child))
+        return entries
+
+    @staticmethod
+    def _parse_leaf(node: bytes, key_length: int, pad: bytes) -> List[Tuple[bytes, int]]:
+        """Decode a compact leaf node into (key, record number) entries."""
+        count = struct.unpack('<H', node[2:4])[0]
+        recno_mask = struct.unpack('<I', node[14:18])[0]
+        dup_mask, trail_mask = node[18], node[19]
+        recno_bits, dup_bits = node[20], node[21]
+        entry_bytes = node[23]
+
+        entries = []
+        key_pos = NODE_SIZE
+        previous = b''
+        for i in range(count):
+            pos = 24 + i * entry_bytes
+            info = int.from_bytes(node[pos:pos + entry_bytes], 'little')
+            recno = info & recno_mask
+            dup = (info >> recno_bits) & dup_mask
+            trail = (info >> (recno_bits + dup_bits)) & trail_mask
+            new_bytes = key_length - dup - trail
+            key_pos -= new_bytes
+            key = previous[:dup] + node[key_pos:key_pos + new_bytes] + pad * trail
+            entries.append((key, recno))
+            previous = key
+        return entries
+
+    def iter_leaf_entries(self, root: int, key_length: int, pad: bytes = b' ',
+                          start_node: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+        """
+        Walk the leaf level of a B-tree from left to right.
+
+        Args:
+            root: Offset of the root node
+            key_length: Key length of the tag
+            pad: Byte used to restore trailing bytes compressed out of keys
+            start_node: Optional leaf offset to start from instead of the leftmost leaf
+
+        Yields:
+            Tuples of (raw key bytes, record number or tag header offset)
+        """
+        offset = start_node if start_node is not None else self._leftmost_leaf(root, key_length)
+        visited = set()
+        while offset not in (-1, 0xFFFFFFFF) and offset not in visited:
+            visited.add(offset)
+            node = self._read_node(offset)
+            yield from self._parse_leaf(node, key_length, pad)
+            offset = struct.unpack('<i', node[8:12])[0]
+
+    def iter_range(self, tag: CDXTag, lo: Optional[bytes] = None, hi: Optional[bytes] = None,
+                   pad: bytes = b' ') -> Iterator[Tuple[bytes, int]]:
+        """
+        Walk the keys of a tag between two bounds, in index order.
+
+        The walk descends the B-tree straight to the first leaf that can hold
+        lo and stops at the first key past hi, so only the leaves of the range
+        are read.
+
+        Args:
+            tag: Tag to walk
+            lo: Optional inclusive lower bound (encoded key bytes)
+            hi: Optional inclusive upper bound (encoded key bytes)
+            pad: Byte used to restore trailing bytes compressed out of keys
+
+        Yields:
+            Tuples of (raw key bytes, record number)
+        """
+        if tag.descending:
+            # Keys are stored in reverse order, bounds can't cut the walk short
+            for key, recno in self.iter_leaf_entries(tag.root, tag.key_length, pad):
+                if (lo is None or key >= lo) and (hi is None or key <= hi):
+                    yield key, recno
+            return
+
+        start_node = self._find_leaf(tag.root, tag.key_length, lo) if lo is not None else None
+        for key, recno in self.iter_leaf_entries(tag.root, tag.key_length, pad, start_node):
+            if lo is not None and key < lo:
+                continue
+            if hi is not None and key > hi:
+                return
+            yield key, recno
+
+    def last_entry(self, tag: CDXTag, hi: Optional[bytes] = None, pad: bytes = b' ') -> Optional[Tuple[bytes, int]]:
+        """
+        Get the greatest key of a tag, optionally not above a bound.
+
+        Args:
+            tag: Tag to look in
+            hi: Optional inclusive upper bound (encoded key bytes)
+            pad: Byte used to restore trailing bytes compressed out of keys
+
+        Returns:
+            Tuple of (raw key bytes, record number) or None if no key qualifies
+        """
+        if tag.descending:
+            best = None
+            for entry in self.iter_range(tag, None, hi, pad):
+                if best is None or entry[0] >= best[0]:
+                    best = entry
+            return best
+
+        offset = self._find_leaf(tag.root, tag.key_length, hi) if hi is not None \
+            else self._rightmost_leaf(tag.root, tag.key_length)
+        visited = set()
+        while offset not in (-1, 0xFFFFFFFF) and offset not in visited:
+            visited.add(offset)
+            node = self._read_node(offset)
+            entries = [entry for entry in self._parse_leaf(node, tag.key_length, pad)
+                       if hi is None or entry[0] <= hi]
+            if entries:
+                return entries[-1]
+            offset = struct.unpack('<i', node[4:8])[0]
+        return None
+
+    def _find_leaf(self, root: int, key_length: int, key: bytes) -> int:
+        """Descend to the leaf holding the first key not below key."""
+        offset = root
+        node = self._read_node(offset)
+        while not struct.unpack('<H', node[0:2])[0] & NODE_LEAF:
+            entries = self._parse_interior(node, key_length)
+            if not entries:
+                break
+            # Interior keys are the greatest key of their child
+            child = entries[-1][2]
+            for entry_key, _, entry_child in entries:
+                if entry_key >= key:
+                    child = entry_child
+                    break
+            offset = child
+            node = self._read_node(offset)
+        return offset
+
+    def _rightmost_leaf(self, root: int, key_length: int) -> int:
+        offset = root
+        node = self._read_node(offset)
+        while not struct.unpack('<H', node[0:2])[0] & NODE_LEAF:
+            entries = self._parse_interior(node, key_length)
+            if not entries:
+                break
+            offset = entries[-1][2]
+            node = self._read_node(offset)
+        return offset
+
+    def _leftmost_leaf(self, root: int, key_length: int) -> int:
+        offset = root
+        node = self._read_node(offset)
+        while not struct.unpack('<H', node[0:2])[0] & NODE_LEAF:
+            entries = self._parse_interior(node, key_length)
+            if not entries:
+                break
+            offset = entries[0][2]
+            node = self._read_node(offset)
+        return offset
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
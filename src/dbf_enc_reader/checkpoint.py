@@ -0,0 +1,191 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class ExtractionCheckpoint:
+    def __init__(self, state_path: str, table_name: str, filter_expr: Optional[str] = None,
+                 every_rows: int = 10000, every_seconds: float = 30.0):
+        """
+        Initialize a checkpoint for one table extraction.
+
+        Args:
+            state_path: Path to the local JSON state file
+            table_name: Name of the table being extracted
+            filter_expr: Filter expression of the extraction; a saved checkpoint
+                is only resumed when it was taken with the same filter
+            every_rows: Save progress after this many emitted rows
+            every_seconds: Save progress after this many seconds
+        """
+        self.state_path = Path(state_path)
+        self.table_name = table_name
+        self.filter_expr = filter_expr or ''
+        self.every_rows = every_rows
+        self.every_seconds = every_seconds
+        self.last_recno = 0
+        self.rows_emitted = 0
+        self._rows_since_save = 0
+        self._last_save = time.monotonic()
+
+    def load(self) -> int:
+        """
+        Load the saved state if it belongs to this extraction.
+
+        Returns:
+            Record number of the last checkpointed row (0 to start from the top)
+        """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except json.JSONDecodeError:
+            print(f"Warning: Ignoring corrupt checkpoint file {self.state_path}")
+            return 0
+
+        if state.get('table') != self.table_name or state.get('filter', '') != self.filter_expr:
+            print(f"Warning: Checkpoint {self.state_path} belongs to another extraction, starting over")
+            return 0
+
+        self.last_recno = int(state.get('last_recno', 0))
+        self.rows_emitted = int(state.get('rows_emitted', 0))
+        return self.last_recno
+
+    def advance(self, recno: int) -> bool:
+        """
+        Record that a row was passed to the sink.
+
+        Every row after the loaded checkpoint counts as emitted, including the
+        ones a resumed sink drops because the interrupted run already wrote them.
+
+        Args:
+            recno: Record number of the row
+
+        Returns:
+            True when a checkpoint is due
+        """
+        self.last_recno = recno
+        self.rows_emitted += 1
+        self._rows_since_save += 1
+        return (self._rows_since_save >= self.every_rows
+                or time.monotonic() - self._last_save >= self.every_seconds)
+
+    def save(self) -> None:
+        """Persist the current progress atomically."""
+        state: Dict[str, Any] = {
+            'table': self.table_name,
+            'filter': self.filter_expr,
+            'last_recno': self.last_recno,
+            'rows_emitted': self.rows_emitted,
+            'saved_at': time.time(),
+        }
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+        self._rows_since_save = 0
+        self._last_save = time.monotonic()
+
+    def clear(self) -> None:
+        """Remove the state file once the extraction has completed."""
+        try:
+            self.state_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class JsonLinesSink:
+    RECNO_FIELD = '_recno'
+
+    def __init__(self, output_path: str):
+        """
+        Initialize a JSON lines sink that tags rows with their record number.
+
+        The file is opened by start(): a fresh extraction overwrites it, a
+        resumed one appends and drops the rows the interrupted run already wrote.
+
+        Args:
+            output_path: Path to the .jsonl output file
+        """
+        self.output_path = Path(output_path)
+        self.high_water = 0
+        self.file = None
+
+    def start(self, after_recno: int) -> None:
+        """
+        Open the output for an extraction starting after a record number.
+
+        Args:
+            after_recno: Record number of the checkpoint being resumed (0 for a
+                fresh extraction, which truncates the file)
+        """
+        if after_recno:
+            # Rows past the checkpoint up to the file's last row were written
+            # by the interrupted run and are read again
+            self.high_water = self._scan_high_water()
+            self.file = open(self.output_path, 'a', encoding='utf-8')
+        else:
+            self.high_water = 0
+            self.file = open(self.output_path, 'w', encoding='utf-8')
+
+    def _scan_high_water(self) -> int:
+        """Find the highest record number already written, truncating a torn last line."""
+        if not self.output_path.exists():
+            return 0
+        high_water = 0
+        valid_size = 0
+        with open(self.output_path, 'rb') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                high_water = max(high_water, int(row.get(self.RECNO_FIELD, 0)))
+                valid_size += len(line)
+        if valid_size != self.output_path.stat().st_size:
+            with open(self.output_path, 'r+b') as f:
+                f.truncate(valid_size)
+        return high_water
+
+    def write(self, recno: int, record: Dict[str, Any]) -> bool:
+        """
+        Append a record unless it was already written by a previous run.
+
+        Returns:
+            True if the record was written
+        """
+        if self.file is None:
+            raise RuntimeError("JsonLinesSink.start() must be called before writing")
+        if recno <= self.high_water:
+            return False
+        row = {self.RECNO_FIELD: recno}
+        row.update(record)
+        self.file.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+        self.high_water = recno
+        return True
+
+    def flush(self) -> None:
+        """Make written rows durable before a checkpoint is saved."""
+        if self.file is None:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
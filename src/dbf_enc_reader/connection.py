@@ -71,7 +71,8 @@ class DBFConnection:
                 "Advantage DLL path not set. Call DBFConnection.set_dll_path() first with the path to Advantage.Data.Provider.dll"
             )
 
-    def __init__(self, data_source: str, encryption_password: str = None, encrypted: bool = True):
+    def __init__(self, data_source: str, encryption_password: str = None, encrypted: bool = True,
+                 show_deleted: bool = False):
         """
         Initialize DBF connection.
         
@@ -79,6 +80,7 @@ class DBFConnection:
             data_source: Path to the DBF file
             encryption_password: Password for encrypted DBF (optional if not encrypted)
             encrypted: Whether the DBF files are encrypted
+            show_deleted: Whether records flagged as deleted are visible to readers
         """
         # Use the data source path directly without resolving it
         self.data_source = data_source
@@ -131,7 +133,8 @@ class DBFConnection:
             f"data source={self.data_source}; ",
             "ServerType=LOCAL; ",
             "TableType=CDX; ",
-            "Shared=TRUE; "
+            "Shared=TRUE; ",
+            f"ShowDeleted={'TRUE' if show_deleted else 'FALSE'}; "
         ]
         
         # Log the full connection string (without password)
@@ -1,5 +1,8 @@
 from decimal import Decimal
-from typing import Any
+from typing import Any, List
+
+# Code pages where one byte is not always one character
+MULTIBYTE_CODEPAGES = {'cp932', 'cp936', 'cp949', 'cp950'}
 
 class DataConverter:
     def smart_trim(self, value: Any) -> Any:
@@ -54,3 +57,36 @@ class DataConverter:
             
         # Apply smart trimming after conversion
         return self.smart_trim(value)
+
+    def decode_text_batch(self, values: List[bytes], codepage: str) -> List[str]:
+        """
+        Decode a column batch of raw DBF character values with a single decode call.
+        
+        Values must already be trimmed as bytes. Pure ASCII batches take the
+        ASCII codec; single-byte code pages decode the joined batch once and
+        split it back, since every byte maps to exactly one character.
+        
+        Args:
+            values: Trimmed raw values of one column
+            codepage: Python codec name of the table code page (e.g. 'cp850')
+            
+        Returns:
+            Decoded strings in the same order
+        """
+        if not values:
+            return []
+        if codepage in MULTIBYTE_CODEPAGES:
+            return [value.decode(codepage, errors='replace') for value in values]
+            
+        joined = b'\x00'.join(values)
+        if joined.count(b'\x00') != len(values) - 1:
+            # Embedded NUL bytes, split on the known lengths instead
+            text = b''.join(values).decode('ascii' if joined.isascii() else codepage, errors='replace')
+            decoded, pos = [], 0
+            for value in values:
+                decoded.append(text[pos:pos + len(value)])
+                pos += len(value)
+            return decoded
+        if joined.isascii():
+            return joined.decode('ascii').split('\x00')
+        return joined.decode(codepage, errors='replace').split('\x00')
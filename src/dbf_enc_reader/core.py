@@ -1,14 +1,33 @@
 import clr
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Iterable, Callable
 from pathlib import Path
 
 from .connection import DBFConnection
 from .converters import DataConverter
+from .aggregation import HashAggregator
+from .checkpoint import ExtractionCheckpoint
+from .raw_reader import RawDBFReader, FieldDescriptor, NUMERIC_FIELD_TYPES, resolve_table_file
+from .cdx import CDXIndex, CDXTag, key_type_for, key_pad, encode_key, decode_key
+from .metadata_cache import TableMetadataCache
+from .pipeline import ExtractionPipeline, batched
+from .snapshot import TableSnapshot, ReadAheadFile
+from .pagination import PageCursor, filter_signature
+from src.filters.predicates import compile_filters, uses_or
+from src.filters.expressions import CompiledExpression, NotTranslatableError, combine
 
 class DBFReader:
-    def __init__(self, data_source: str, encryption_password: str = None, encrypted: bool = True):
+    BACKENDS = ('ads', 'raw')
+    # .NET types the provider uses for numeric fields
+    NUMERIC_CLR_TYPES = ('Decimal', 'Double', 'Single', 'Int16', 'Int32', 'Int64')
+
+    def __init__(self, data_source: str, encryption_password: str = None, encrypted: bool = True,
+                 backend: str = 'ads', codepage: Optional[str] = None,
+                 metadata_cache: Optional[TableMetadataCache] = None, snapshot: bool = False,
+                 snapshot_dir: Optional[str] = None, read_ahead: bool = False):
         """
         Initialize DBF reader with connection parameters.
         
@@ -16,9 +35,33 @@ class DBFReader:
             data_source: Path to the DBF file
             encryption_password: Password for encrypted DBF (optional if not encrypted)
             encrypted: Whether the DBF files are encrypted
+            backend: 'ads' to read through the Advantage provider, 'raw' to parse
+                unencrypted .DBF files directly
+            codepage: Optional codec overriding the table language driver (raw backend)
+            metadata_cache: Optional cache serving get_table_info from the file headers
+            snapshot: Copy each table's .DBF/.CDX/.FPT to local disk and read the copy;
+                a table is copied once and this reader keeps reading that copy until
+                refresh_snapshots() or close()
+            snapshot_dir: Optional local directory for snapshots
+            read_ahead: Read table files through a block cache with read-ahead (raw backend)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'raw' and encrypted:
+            raise ValueError("The raw backend cannot read encrypted tables")
+            
         # Log the data source path being used
         logging.info(f"Initializing DBFReader with data source: {data_source}")
+        self.data_source = data_source
+        self.backend = backend
+        self.codepage = codepage
+        self.metadata_cache = metadata_cache
+        self.encryption_password = encryption_password
+        self.encrypted = encrypted
+        self.snapshot = TableSnapshot(data_source, snapshot_dir) if snapshot else None
+        self._snapshot_dirs: Dict[str, str] = {}
+        self._snapshot_lock = threading.Lock()
+        self.read_ahead = read_ahead
         self.connection = DBFConnection(data_source, encryption_password, encrypted)
         self.converter = DataConverter()
 
@@ -33,49 +76,32 @@ class DBFReader:
         Returns:
             List of records as dictionaries
         """
-        results = []
-        with self.connection as conn:
-            from System.Data import CommandType
-            
-            # Create command with TableDirect for better performance
-            cmd = conn.conn.CreateCommand()
-            cmd.CommandType = CommandType.TableDirect
-            cmd.CommandText = table_name
-            cmd.AdsOptimizedFilters = True  # Enable AOF for better performance
+        return list(self.iter_table(table_name, limit, filters))
+
+    def iter_table(self, table_name: str, limit: Optional[int] = None, filters: Optional[List[Dict[str, Any]]] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream records from a table one at a time with optional filters.
+        
+        Args:
+            table_name: Name of the table to read
+            limit: Optional limit on number of records to read
+            filters: Optional list of filter conditions
+            fields: Optional list of field names to read (all fields if omitted)
             
-            # Get reader
-            reader = cmd.ExecuteExtendedReader()
+        Yields:
+            Records as dictionaries
+        """
+        if self.backend == 'raw':
+            for count, (_, record) in enumerate(self._iter_raw(table_name, filters, fields)):
+                if limit and count >= limit:
+                    break
+                yield record
+            return
             
-            # Apply filters if any
-            if filters:
-                filter_conditions = []
-                use_or = len(filters) > 1 and all(f['field'] == filters[0]['field'] for f in filters)
-                
-                for f in filters:
-                    print(f' filter ////// {f}')
-                    if f['operator'] == 'range':
-                        filter_conditions.append(
-                            f"{f['field']} >= '{f['from_value']}' AND "
-                            f"{f['field']} <= '{f['to_value']}'"
-                        )
-                    else:
-                        filter_conditions.append(
-                            f"{f['field']}{f['operator']} '{f['value']}'"
-                        )
-
-                print(f'HERE ------ {filter_conditions}')        
-                
-                if filter_conditions:
-                    join_op = " OR " if use_or else " AND "
-                    filter_expr = join_op.join(filter_conditions)
-                    # print(f"\nApplying AOF filter: {filter_expr}")
-                    
-                    try:
-                        reader.Filter = filter_expr
-                    except Exception as e:
-                        print(f"\nFilter error: {str(e)}")
-                        print(f"Filter expression: {filter_expr}")
-                        raise
+        with self._connect(table_name) as conn:
+            reader, residual = self._open_filtered_reader(conn, table_name, filters)
+            read_fields = self._with_residual_fields(fields, residual)
+            ordinals = self._resolve_ordinals(reader, read_fields)
             
             # Process results
             count = 0
@@ -84,17 +110,748 @@ class DBFReader:
                 if limit and count >= limit:
                     break
                     
-                record = {}
-                for i in range(reader.FieldCount):
-                    field_name = reader.GetName(i)
-                    value = reader.GetValue(i)
-                    record[field_name] = self.converter.convert_value(value)
-                 
-                results.append(record)
+                record = self._read_record(reader, ordinals)
+                if residual is not None:
+                    if not residual(record):
+                        continue
+                    if read_fields is not fields:
+                        record = self._project(record, fields)
+                yield record
                 count += 1
+
+    def _table_source(self, table_name: str) -> str:
+        """Get the directory to read a table from, taking a local snapshot on first use if enabled."""
+        if not self.snapshot:
+            return self.data_source
+        key = Path(table_name).stem.upper()
+        with self._snapshot_lock:
+            directory = self._snapshot_dirs.get(key)
+            if directory is None:
+                directory = self._snapshot_dirs[key] = self.snapshot.create(table_name)
+            return directory
+
+    def refresh_snapshots(self, table_name: Optional[str] = None) -> None:
+        """
+        Let the next read of a table take a new snapshot instead of reusing this reader's copy.
+        
+        Page cursors issued before a refresh may skip or repeat rows, since
+        the table may have changed between the two copies.
+        
+        Args:
+            table_name: Table to refresh (all tables read so far if omitted)
+        """
+        with self._snapshot_lock:
+            keys = [Path(table_name).stem.upper()] if table_name else list(self._snapshot_dirs)
+            released = [self._snapshot_dirs.pop(key) for key in keys if key in self._snapshot_dirs]
+        for directory in released:
+            self.snapshot.release(directory)
+
+    def close(self) -> None:
+        """Give back the snapshots held by this reader."""
+        if self.snapshot:
+            self.refresh_snapshots()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _connect(self, table_name: str) -> DBFConnection:
+        """Get the connection to read a table with, pointing at its snapshot if enabled."""
+        if self.snapshot:
+            return DBFConnection(self._table_source(table_name), self.encryption_password, self.encrypted)
+        return self.connection
+
+    def _open_raw(self, table_name: str) -> RawDBFReader:
+        """Open a table file directly for the raw backend."""
+        path = resolve_table_file(self._table_source(table_name), table_name)
+        if not path:
+            raise FileNotFoundError(f"Table file not found for {table_name} in {self.data_source}")
+        return RawDBFReader(path, self.codepage, self.converter, ReadAheadFile if self.read_ahead else None)
+
+    def _iter_raw(self, table_name: str, filters: Optional[List[Dict[str, Any]]] = None,
+                  fields: Optional[List[str]] = None, start_recno: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (record number, record) pairs from a table file.
+        
+        Filters are compiled into a column mask, so only the filtered fields are
+        decoded for rows that end up rejected.
+        
+        Args:
+            table_name: Name of the table to read
+            filters: Optional list of filter conditions
+            fields: Optional list of field names to return (all fields if omitted)
+            start_recno: Record number to start from
+            
+        Yields:
+            Tuples of (record number, record dictionary)
+        """
+        with self._open_raw(table_name) as raw:
+            yield from raw.iter_records(fields, start_recno, where=compile_filters(filters, self._field_types(raw)))
+
+    @staticmethod
+    def _field_types(raw: RawDBFReader) -> Dict[str, str]:
+        """Get the DBF type letter of each field, for filter compilation."""
+        return {field.name: field.type for field in raw.fields}
+
+    def _open_filtered_reader(self, conn: DBFConnection, table_name: str, filters: Optional[List[Dict[str, Any]]] = None,
+                              after_recno: int = 0):
+        """Open a TableDirect extended reader with the AOF filter applied.
+        
+        Args:
+            conn: Open DBF connection
+            table_name: Name of the table to read
+            filters: Optional list of filter conditions
+            after_recno: Only return records after this record number
             
+        Returns:
+            Tuple of (extended data reader positioned before the first record,
+            residual expression to apply in Python for conditions AOF cannot express)
+        """
+        from System.Data import CommandType
+        
+        # Create command with TableDirect for better performance
+        cmd = conn.conn.CreateCommand()
+        cmd.CommandType = CommandType.TableDirect
+        cmd.CommandText = table_name
+        cmd.AdsOptimizedFilters = True  # Enable AOF for better performance
+        
+        # Get reader
+        reader = cmd.ExecuteExtendedReader()
+        
+        # Apply filters if any
+        filter_expr, residual = self._plan_filters(filters)
+        if after_recno:
+            # RECNO() is optimizable, so this seeks rather than skipping rows
+            recno_expr = f"RECNO() > {int(after_recno)}"
+            filter_expr = f"({filter_expr}) AND {recno_expr}" if filter_expr else recno_expr
+        if filter_expr:
+            # print(f"\nApplying AOF filter: {filter_expr}")
+            try:
+                reader.Filter = filter_expr
+            except Exception as e:
+                print(f"\nFilter error: {str(e)}")
+                print(f"Filter expression: {filter_expr}")
+                raise
+        
+        return reader, residual
+
+    def _plan_filters(self, filters: Optional[List[Dict[str, Any]]]) -> Tuple[Optional[str], Optional[CompiledExpression]]:
+        """Build an AOF filter expression from a list of filter conditions.
+        
+        Expression filters are translated to AOF when possible; the ones that
+        cannot be (e.g. LIKE with '_' wildcards), and the ones whose AOF is a
+        prefix match on strings, are returned as a residual expression for the
+        caller to evaluate on each record.
+        
+        Args:
+            filters: Optional list of filter conditions
+            
+        Returns:
+            Tuple of (filter expression string or None, residual expression or None)
+        """
+        if not filters:
+            return None, None
+            
+        filter_conditions = []
+        residual = []
+        use_or = uses_or(filters)
+        
+        for f in filters:
+            print(f' filter ////// {f}')
+            if f['operator'] == 'expression':
+                try:
+                    filter_conditions.append(f"({f['expression'].to_aof()})")
+                    if f['expression'].prefix_match:
+                        # The AOF string equality also matches longer values; recheck exactly
+                        residual.append(f['expression'])
+                except NotTranslatableError as e:
+                    logging.info(f"Evaluating filter in Python: {str(e)}")
+                    residual.append(f['expression'])
+            elif f['operator'] == 'range':
+                filter_conditions.append(
+                    f"{f['field']} >= '{f['from_value']}' AND "
+                    f"{f['field']} <= '{f['to_value']}'"
+                )
+            else:
+                filter_conditions.append(
+                    f"{f['field']}{f['operator']} '{f['value']}'"
+                )
+
+        print(f'HERE ------ {filter_conditions}')        
+        
+        join_op = " OR " if use_or else " AND "
+        return join_op.join(filter_conditions) or None, combine(residual)
+
+    def _with_residual_fields(self, fields: Optional[List[str]], residual: Optional[CompiledExpression]) -> Optional[List[str]]:
+        """Add the fields a residual expression needs to a field projection."""
+        if not fields or residual is None:
+            return fields
+        wanted = {name.upper() for name in fields}
+        missing = [name for name in residual.fields if name.upper() not in wanted]
+        return list(fields) + missing if missing else fields
+
+    def _project(self, record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Keep only the requested fields of a record."""
+        if not fields:
+            return record
+        wanted = {name.upper() for name in fields}
+        return {name: value for name, value in record.items() if name.upper() in wanted}
+
+    def _resolve_ordinals(self, reader, fields: Optional[List[str]] = None) -> List[Tuple[int, str]]:
+        """Map requested field names to reader ordinals.
+        
+        Args:
+            reader: Open data reader
+            fields: Optional list of field names (all fields if omitted)
+            
+        Returns:
+            List of (ordinal, field name) pairs in reader order
+        """
+        ordinals = [(i, reader.GetName(i)) for i in range(reader.FieldCount)]
+        if not fields:
+            return ordinals
+            
+        wanted = {name.upper() for name in fields}
+        selected = [(i, name) for i, name in ordinals if name.upper() in wanted]
+        missing = wanted - {name.upper() for _, name in selected}
+        if missing:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(missing))}")
+        return selected
+
+    def lookup_keys(self, table_name: str, field: str, keys: Iterable[Any], tag: Optional[str] = None,
+                    filters: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch all records whose field matches any of the given keys.
+        
+        Keys are converted to the key field's type, sorted and deduplicated,
+        then each one is seeked through the CDX tag for the field. If the table
+        has no usable tag the lookup falls back to a single scan that
+        semi-joins the records against a hash set.
+        
+        Args:
+            table_name: Name of the table to read
+            field: Key field name, e.g. NOTA_FOLIO
+            keys: Collection of key values to look up
+            tag: Optional CDX tag name (defaults to the field name)
+            filters: Optional list of filter conditions applied on top of the lookup
+            
+        Returns:
+            List of matching records as dictionaries, in key order when seeked
+        """
+        keys = [key for key in keys if key is not None]
+        if not keys:
+            return []
+        
+        if self.backend == 'raw':
+            return self._lookup_raw(table_name, field, keys, tag, filters)
+            
+        with self._connect(table_name) as conn:
+            reader, residual = self._open_filtered_reader(conn, table_name, filters)
+            ordinals = self._resolve_ordinals(reader)
+            key_ordinal = self._resolve_ordinals(reader, [field])[0][0]
+            numeric = reader.GetFieldType(key_ordinal).Name in self.NUMERIC_CLR_TYPES
+            unique_keys = self._typed_keys(keys, numeric)
+            
+            if self._activate_index(reader, tag or field):
+                results = self._seek_keys(reader, ordinals, key_ordinal, sorted(unique_keys.values()), numeric)
+            else:
+                logging.info(f"No index tag for {table_name}.{field}, using hash semi-join scan")
+                results = []
+                while reader.Read():
+                    if self._key_token(reader.GetValue(key_ordinal), numeric) not in unique_keys:
+                        continue
+                    results.append(self._read_record(reader, ordinals))
+            if residual is not None:
+                results = [record for record in results if residual(record)]
             return results
+
+    def _lookup_raw(self, table_name: str, field: str, keys: List[Any], tag: Optional[str],
+                    filters: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Look up keys on the raw backend, through the .CDX tag of the field when there is one."""
+        with self._open_raw(table_name) as raw:
+            key_field = raw.select_fields([field])[0]
+            numeric = key_field.type in NUMERIC_FIELD_TYPES
+            unique_keys = self._typed_keys(keys, numeric)
+            where = compile_filters(filters, self._field_types(raw))
+            
+            index = self._open_key_index(table_name, raw, tag or field, key_field)
+            if index is None:
+                logging.info(f"No index tag for {table_name}.{field}, using hash semi-join scan")
+                return [record for _, record in raw.iter_records(where=where)
+                        if self._key_token(record.get(key_field.name), numeric) in unique_keys]
+            
+            with index:
+                cdx_tag, key_type, _ = self._resolve_tag(raw, index, tag or field)
+                pad = key_pad(key_type)
+                results = []
+                for key in sorted(unique_keys.values()):
+                    token = self._key_token(key, numeric)
+                    encoded = encode_key(key, key_type, cdx_tag.key_length, raw.codepage, cdx_tag.expression)
+                    for _, recno in index.iter_range(cdx_tag, encoded, encoded, pad):
+                        record = raw.read_record(recno)
+                        # Deleted records stay in the index, truncated keys can collide
+                        if record is None or self._key_token(record.get(key_field.name), numeric) != token:
+                            continue
+                        if where is None or where(record):
+                            results.append(record)
+                return results
+
+    def _open_key_index(self, table_name: str, raw: RawDBFReader, tag: str,
+                        key_field: FieldDescriptor) -> Optional[CDXIndex]:
+        """Open the .CDX index if it has an unfiltered tag on exactly the key field."""
+        cdx_path = resolve_table_file(self._table_source(table_name), table_name, '.CDX')
+        if not cdx_path:
+            return None
+        index = CDXIndex(cdx_path, ReadAheadFile if self.read_ahead else None)
+        cdx_tag = index.tags.get(tag.upper())
+        if cdx_tag is not None and not cdx_tag.for_expression:
+            _, tag_field = key_type_for(cdx_tag.expression, raw.fields)
+            if tag_field is not None and tag_field.name.upper() == key_field.name.upper():
+                return index
+        index.close()
+        return None
+
+    def _activate_index(self, reader, tag: str) -> bool:
+        """Set the active index order on a reader, returning False if the tag is unavailable."""
+        try:
+            reader.ActiveIndex = tag
+            return True
+        except Exception as e:
+            logging.debug(f"Index tag '{tag}' not available: {str(e)}")
+            return False
+
+    def _seek_keys(self, reader, ordinals: List[Tuple[int, str]], key_ordinal: int, ordered_keys: List[Any],
+                   numeric: bool) -> List[Dict[str, Any]]:
+        """Seek each key through the active index and collect every matching record."""
+        from Advantage.Data.Provider import AdsExtendedReader
+        
+        results = []
+        for key in ordered_keys:
+            if not reader.Seek([key], AdsExtendedReader.SeekType.HardSeek):
+                continue
+            token = self._key_token(key, numeric)
+            # Seek positions on the first match (a prefix match for character keys),
+            # duplicates follow in index order
+            while self._key_token(reader.GetValue(key_ordinal), numeric) == token:
+                results.append(self._read_record(reader, ordinals))
+                if not reader.Read():
+                    break
+        return results
+
+    def _read_record(self, reader, ordinals: List[Tuple[int, str]]) -> Dict[str, Any]:
+        """Convert the reader's current row into a record dictionary."""
+        return {field_name: self.converter.convert_value(reader.GetValue(i)) for i, field_name in ordinals}
+
+    def _typed_keys(self, keys: Iterable[Any], numeric: bool) -> Dict[str, Any]:
+        """
+        Deduplicate lookup keys and convert them to the key field's type.
+        
+        Numeric keys become ints or floats, so '287732' seeks a numeric field
+        like 287732 does; keys that are not numbers can't match and are dropped.
+        Character keys become trimmed strings.
+        
+        Returns:
+            Dictionary of comparison token to typed key
+        """
+        typed = {}
+        for key in keys:
+            token = self._key_token(key, numeric)
+            if not numeric:
+                typed[token] = token
+                continue
+            try:
+                number = Decimal(token)
+            except InvalidOperation:
+                continue
+            if number.is_finite():
+                typed[token] = int(number) if number == number.to_integral_value() else float(number)
+        return typed
+
+    def _key_token(self, value: Any, numeric: bool) -> str:
+        """Normalize a key for comparison.
+        
+        Keys of numeric fields compare by value, so 287732, '287732' and
+        Decimal('287732.00') are equal. Keys of character fields compare as
+        trimmed text, so '00123' and '123' stay different.
+        """
+        token = str(self.converter.convert_value(value)).strip()
+        if not numeric:
+            return token
+        try:
+            number = Decimal(token)
+        except InvalidOperation:
+            return token
+        return str(number.normalize()) if number.is_finite() else token
+
+    def scan_index_keys(self, table_name: str, tag: str, lo: Any = None, hi: Any = None,
+                        fetch: bool = False, fields: Optional[List[str]] = None) -> Iterator[Tuple[Any, int, Optional[Dict[str, Any]]]]:
+        """
+        Walk the keys of a CDX tag in index order without reading the table.
+        
+        Only the B-tree leaves covering [lo, hi] are read. Table records are
+        read only when fetch is set, one record per key. Keys of deleted
+        records are included, like in the index itself; their fetched record
+        is None.
+        
+        Args:
+            table_name: Name of the table
+            tag: CDX tag name, e.g. NOTA_FOLIO
+            lo: Optional inclusive lower bound for the key
+            hi: Optional inclusive upper bound for the key
+            fetch: Also read the record each key points to
+            fields: Optional list of field names to read when fetching
+            
+        Yields:
+            Tuples of (key, record number, record dictionary or None)
+            
+        Raises:
+            ValueError: If the tables are encrypted or the tag does not exist
+        """
+        raw, index = self._open_index(table_name)
+        with raw, index:
+            cdx_tag, key_type, field = self._resolve_tag(raw, index, tag)
+            lo_key = encode_key(lo, key_type, cdx_tag.key_length, raw.codepage, cdx_tag.expression) if lo is not None else None
+            hi_key = encode_key(hi, key_type, cdx_tag.key_length, raw.codepage, cdx_tag.expression) if hi is not None else None
+            for key, recno in index.iter_range(cdx_tag, lo_key, hi_key, key_pad(key_type)):
+                record = raw.read_record(recno, fields) if fetch else None
+                yield decode_key(key, key_type, raw.codepage, field), recno, record
+
+    def distinct_keys(self, table_name: str, tag: str, lo: Any = None, hi: Any = None) -> List[Any]:
+        """
+        List the distinct keys of a CDX tag in index order, reading only the index.
+        
+        Args:
+            table_name: Name of the table
+            tag: CDX tag name
+            lo: Optional inclusive lower bound for the key
+            hi: Optional inclusive upper bound for the key
             
+        Returns:
+            List of distinct keys
+        """
+        keys = []
+        for key, _, _ in self.scan_index_keys(table_name, tag, lo, hi):
+            if not keys or keys[-1] != key:
+                keys.append(key)
+        return keys
+
+    def min_key(self, table_name: str, tag: str, lo: Any = None, hi: Any = None) -> Any:
+        """
+        Get the smallest key of a CDX tag within optional bounds.
+        
+        Returns:
+            The key, or None if no key is in range
+        """
+        for key, _, _ in self.scan_index_keys(table_name, tag, lo, hi):
+            return key
+        return None
+
+    def max_key(self, table_name: str, tag: str, lo: Any = None, hi: Any = None) -> Any:
+        """
+        Get the greatest key of a CDX tag within optional bounds, e.g. the latest folio.
+        
+        The lookup descends the rightmost path of the B-tree (or the path to hi),
+        so it reads a handful of index nodes whatever the table size.
+        
+        Returns:
+            The key, or None if no key is in range
+        """
+        raw, index = self._open_index(table_name)
+        with raw, index:
+            cdx_tag, key_type, field = self._resolve_tag(raw, index, tag)
+            hi_key = encode_key(hi, key_type, cdx_tag.key_length, raw.codepage, cdx_tag.expression) if hi is not None else None
+            entry = index.last_entry(cdx_tag, hi_key, key_pad(key_type))
+            if entry is None:
+                return None
+            if lo is not None and entry[0] < encode_key(lo, key_type, cdx_tag.key_length, raw.codepage, cdx_tag.expression):
+                return None
+            return decode_key(entry[0], key_type, raw.codepage, field)
+
+    def _open_index(self, table_name: str) -> Tuple[RawDBFReader, CDXIndex]:
+        """Open a table file and its .CDX index for index-only reads."""
+        if self.encrypted:
+            raise ValueError("Index-only scans read the .CDX file directly and need unencrypted tables")
+        cdx_path = resolve_table_file(self._table_source(table_name), table_name, '.CDX')
+        if not cdx_path:
+            raise FileNotFoundError(f"Index file not found for {table_name} in {self.data_source}")
+        raw = self._open_raw(table_name)
+        try:
+            index = CDXIndex(cdx_path, ReadAheadFile if self.read_ahead else None)
+        except Exception:
+            raw.close()
+            raise
+        return raw, index
+
+    def _resolve_tag(self, raw: RawDBFReader, index: CDXIndex, tag: str) -> Tuple[CDXTag, str, Optional[FieldDescriptor]]:
+        """Find a tag and how its keys are encoded."""
+        cdx_tag = index.tags.get(tag.upper())
+        if cdx_tag is None:
+            raise ValueError(f"Tag {tag} not found in {index.path}, available tags: {', '.join(index.tag_names())}")
+        key_type, field = key_type_for(cdx_tag.expression, raw.fields)
+        return cdx_tag, key_type, field
+
+    def iter_tombstones(self, table_name: str, key_field: str, after_recno: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the records flagged as deleted, so mirrors can apply deletes without a full diff.
+        
+        On the raw backend only the deletion flag of each record is checked,
+        and just the key field of deleted records is decoded.
+        
+        A record can be deleted at any record number, so a mirror syncing
+        deletes must scan from record 1 every time; after_recno only splits
+        one such scan into pages and does not find deletes newer than a
+        previous run.
+        
+        Args:
+            table_name: Name of the table
+            key_field: Field identifying the record downstream, e.g. NO_REFEREN
+            after_recno: Only report records after this record number (for
+                paging through one scan, not for incremental syncs)
+            
+        Yields:
+            Dictionaries with 'recno' and the key field value
+        """
+        if self.backend == 'raw':
+            with self._open_raw(table_name) as raw:
+                for recno, record in raw.iter_records([key_field], after_recno + 1, deleted=True):
+                    yield {'recno': recno, **record}
+            return
+            
+        from System.Data import CommandType
+        
+        with DBFConnection(self._table_source(table_name), self.encryption_password, self.encrypted,
+                           show_deleted=True) as conn:
+            cmd = conn.conn.CreateCommand()
+            cmd.CommandType = CommandType.TableDirect
+            cmd.CommandText = table_name
+            cmd.AdsOptimizedFilters = True
+            reader = cmd.ExecuteExtendedReader()
+            filter_expr = "DELETED()"
+            if after_recno:
+                filter_expr += f" AND RECNO() > {int(after_recno)}"
+            reader.Filter = filter_expr
+            ordinals = self._resolve_ordinals(reader, [key_field])
+            while reader.Read():
+                yield {'recno': reader.RecordNumber, **self._read_record(reader, ordinals)}
+
+    def extract_resumable(self, table_name: str, sink, checkpoint_path: str,
+                          filters: Optional[List[Dict[str, Any]]] = None,
+                          checkpoint_rows: int = 10000, checkpoint_seconds: float = 30.0) -> int:
+        """
+        Extract a table into a sink, checkpointing progress by record number.
+        
+        A rerun after a failure resumes right after the last checkpointed record
+        through a RECNO() filter instead of re-reading the table from the top.
+        Rows emitted between that checkpoint and the failure are read again, so
+        the sink must drop record numbers it already holds (see JsonLinesSink).
+        Without a matching checkpoint the extraction starts over and the sink
+        is told to discard its previous output.
+        
+        Args:
+            table_name: Name of the table to extract
+            sink: Object with start(after_recno), write(recno, record) and flush() methods
+            checkpoint_path: Path to the local checkpoint state file
+            filters: Optional list of filter conditions
+            checkpoint_rows: Save progress every this many rows
+            checkpoint_seconds: Save progress at least this often
+            
+        Returns:
+            Total number of rows emitted across all runs of this extraction
+        """
+        filter_expr, residual = self._plan_filters(filters)
+        if residual is not None:
+            filter_expr = f"{filter_expr or ''} | {residual.source}"
+        checkpoint = ExtractionCheckpoint(checkpoint_path, table_name, filter_expr,
+                                          checkpoint_rows, checkpoint_seconds)
+        start_recno = checkpoint.load()
+        sink.start(start_recno)
+        if start_recno:
+            logging.info(f"Resuming {table_name} after record {start_recno} "
+                         f"({checkpoint.rows_emitted} rows already emitted)")
+        
+        for recno, record in self._iter_numbered(table_name, filters, start_recno):
+            # Rows the sink drops were written after the checkpoint by the failed run, they still count
+            sink.write(recno, record)
+            if checkpoint.advance(recno):
+                sink.flush()
+                checkpoint.save()
+        
+        sink.flush()
+        checkpoint.clear()
+        return checkpoint.rows_emitted
+
+    def _iter_numbered(self, table_name: str, filters: Optional[List[Dict[str, Any]]] = None,
+                       after_recno: int = 0, fields: Optional[List[str]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (record number, record) pairs in record number order.
+        
+        Args:
+            table_name: Name of the table to read
+            filters: Optional list of filter conditions
+            after_recno: Only return records after this record number
+            fields: Optional list of field names to read (all fields if omitted)
+            
+        Yields:
+            Tuples of (record number, record dictionary)
+        """
+        if self.backend == 'raw':
+            yield from self._iter_raw(table_name, filters, fields, start_recno=after_recno + 1)
+            return
+            
+        with self._connect(table_name) as conn:
+            reader, residual = self._open_filtered_reader(conn, table_name, filters, after_recno=after_recno)
+            read_fields = self._with_residual_fields(fields, residual)
+            ordinals = self._resolve_ordinals(reader, read_fields)
+            while reader.Read():
+                record = self._read_record(reader, ordinals)
+                if residual is None or residual(record):
+                    if read_fields is not fields:
+                        record = self._project(record, fields)
+                    yield reader.RecordNumber, record
+
+    def read_page(self, table_name: str, page_size: int = 100, cursor: Optional[str] = None,
+                  filters: Optional[List[Dict[str, Any]]] = None,
+                  fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Read one page of a table in record number order.
+        
+        The returned cursor holds the record number of the last row of the page.
+        The next call seeks past it through RECNO() (or the record offset on the
+        raw backend), so every page costs about as much as the first one.
+        
+        Args:
+            table_name: Name of the table to read
+            page_size: Maximum number of records per page
+            cursor: Cursor returned by the previous page (None for the first page)
+            filters: Optional list of filter conditions, the same for every page
+            fields: Optional list of field names to read (all fields if omitted)
+            
+        Returns:
+            Tuple of (records, cursor for the next page or None after the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid or was issued for another table or filters
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        after_recno = 0
+        if cursor:
+            page_cursor = PageCursor.decode(cursor)
+            page_cursor.check(table_name, filters)
+            after_recno = page_cursor.last_recno
+            
+        records = []
+        last_recno = after_recno
+        has_more = False
+        for recno, record in self._iter_numbered(table_name, filters, after_recno, fields):
+            if len(records) == page_size:
+                # One row past the page tells whether another page exists
+                has_more = True
+                break
+            records.append(record)
+            last_recno = recno
+            
+        if not has_more:
+            return records, None
+        return records, PageCursor(table_name, last_recno, filter_signature(filters)).encode()
+
+    def extract_pipelined(self, table_name: str, sink: Callable[[List[Dict[str, Any]]], None],
+                          filters: Optional[List[Dict[str, Any]]] = None, fields: Optional[List[str]] = None,
+                          batch_size: int = 1000, queue_size: int = 4) -> Dict[str, Any]:
+        """
+        Extract a table through overlapped read, convert and sink stages.
+        
+        The reader stage only pulls raw values (one GetValues call per row, or
+        raw record blocks on the raw backend), conversion runs on a second
+        thread, and the sink consumes converted batches on the calling thread.
+        
+        Args:
+            table_name: Name of the table to extract
+            sink: Callable receiving each batch of converted records
+            filters: Optional list of filter conditions
+            fields: Optional list of field names to extract (all fields if omitted)
+            batch_size: Number of rows per batch
+            queue_size: Maximum number of batches buffered between stages
+            
+        Returns:
+            Dictionary with row count, wall time and per-stage throughput and queue depth stats
+        """
+        if self.backend == 'raw':
+            raw = self._open_raw(table_name)
+            try:
+                where = compile_filters(filters, self._field_types(raw))
+                selected = raw.select_fields(fields)
+                
+                def convert(batch):
+                    first_recno, block = batch
+                    return [record for _, record in raw.decode_batch(first_recno, block, selected, where)]
+                
+                pipeline = ExtractionPipeline(lambda: raw.iter_raw_batches(batch_size), convert, sink, queue_size,
+                                              batch_rows=lambda batch: len(batch[1]) // raw.record_length)
+                return pipeline.run()
+            finally:
+                raw.close()
+        
+        names: List[str] = []
+        residuals: List[Optional[CompiledExpression]] = []
+        
+        def produce():
+            from System import Array, Object
+            
+            with self._connect(table_name) as conn:
+                reader, residual = self._open_filtered_reader(conn, table_name, filters)
+                residuals.append(residual)
+                ordinals = self._resolve_ordinals(reader, self._with_residual_fields(fields, residual))
+                names.extend(name for _, name in ordinals)
+                all_fields = len(ordinals) == reader.FieldCount
+                values = Array.CreateInstance(Object, reader.FieldCount)
+                for batch in batched(self._iter_raw_rows(reader, ordinals, values, all_fields), batch_size):
+                    yield batch
+        
+        def convert(batch):
+            convert_value = self.converter.convert_value
+            records = [dict(zip(names, map(convert_value, row))) for row in batch]
+            residual = residuals[0] if residuals else None
+            if residual is not None:
+                records = [self._project(record, fields) for record in records if residual(record)]
+            return records
+        
+        return ExtractionPipeline(produce, convert, sink, queue_size).run()
+
+    def _iter_raw_rows(self, reader, ordinals: List[Tuple[int, str]], values, all_fields: bool) -> Iterator[List[Any]]:
+        """Yield unconverted row values, fetching whole rows with one GetValues call when possible."""
+        while reader.Read():
+            if all_fields:
+                reader.GetValues(values)
+                yield list(values)
+            else:
+                yield [reader.GetValue(i) for i, _ in ordinals]
+
+    def aggregate_table(self, table_name: str, group_by: List[str], aggregates: Dict[str, Tuple[str, str]],
+                        filters: Optional[List[Dict[str, Any]]] = None,
+                        field_types: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Compute group-by aggregates over a filtered scan in a single streaming pass.
+        
+        Only the grouping and aggregated fields are read, and memory grows with
+        the number of groups rather than the number of records.
+        
+        Args:
+            table_name: Name of the table to aggregate
+            group_by: Field names to group by (empty for a single total row)
+            aggregates: Mapping of output name to (function, field), e.g.
+                {"total": ("sum", "TOTAL_BRUT"), "rows": ("count", "*")}
+            filters: Optional list of filter conditions
+            field_types: Optional mapping of DBF field name to mappings.json type
+            
+        Returns:
+            List of result rows, one per group
+        """
+        aggregator = HashAggregator(group_by, aggregates, field_types)
+        records = self.iter_table(table_name, filters=filters, fields=aggregator.required_fields())
+        for record in records:
+            aggregator.add(record)
+        return aggregator.results()
 
     def to_json(self, table_name: str, limit: Optional[int] = None, filters: Optional[List[Dict[str, Any]]] = None) -> str:
         """
@@ -113,7 +870,8 @@ class DBFReader:
 
         # print(f' records  {records}')
         
-        return json.dumps(records, indent=4, ensure_ascii=False)
+        # Raw backend amounts are Decimals, written as their exact digits
+        return json.dumps(records, indent=4, ensure_ascii=False, default=str)
 
     def get_table_info(self, table_name: str) -> Dict[str, Any]:
         """
@@ -125,9 +883,38 @@ class DBFReader:
         Returns:
             Dictionary containing table metadata
         """
-        with self.connection as conn:
+        if self.metadata_cache is not None:
+            metadata = self._cached_table_info(table_name)
+            if metadata is not None:
+                return metadata
+            
+        if self.backend == 'raw':
+            with self._open_raw(table_name) as raw:
+                columns = raw.field_names()
+                return {
+                    'field_count': len(columns),
+                    'columns': columns
+                }
+            
+        with self._connect(table_name) as conn:
             reader = conn.get_reader(table_name)
             return {
                 'field_count': reader.FieldCount,
                 'columns': [reader.GetName(i) for i in range(reader.FieldCount)]
             }
+
+    def _cached_table_info(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Serve table metadata from the cache without opening an Advantage connection."""
+        try:
+            metadata = self.metadata_cache.get(self.data_source, table_name)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Metadata cache miss for {table_name}, falling back to provider: {str(e)}")
+            return None
+        if metadata is None:
+            return None
+        info = {
+            'field_count': len(metadata['fields']),
+            'columns': [field['name'] for field in metadata['fields']]
+        }
+        info.update(metadata)
+        return info
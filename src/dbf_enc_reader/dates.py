@@ -0,0 +1,61 @@
+import re
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+# Dates come out of DataConverter and RawDBFReader as DD/MM/YYYY strings
+RECORD_DATE_FORMAT = '%d/%m/%Y'
+_RECORD_DATE = re.compile(r'^(\d{2})/(\d{2})/(\d{4})$')
+
+# Formats tried after the caller's own when parsing a date value
+_FALLBACK_FORMATS = (RECORD_DATE_FORMAT, '%Y%m%d', '%Y-%m-%d')
+
+
+def format_record_date(day: date) -> str:
+    """Format a date the way records carry it (DD/MM/YYYY)."""
+    return day.strftime(RECORD_DATE_FORMAT)
+
+
+def record_date_key(value: Any) -> Optional[str]:
+    """
+    Get the YYYYMMDD form of a record date, which sorts chronologically.
+
+    Args:
+        value: date/datetime or DD/MM/YYYY string
+
+    Returns:
+        YYYYMMDD string, or None if the value is not a record date
+    """
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y%m%d')
+    if not isinstance(value, str):
+        return None
+    match = _RECORD_DATE.match(value.strip())
+    if not match:
+        return None
+    day, month, year = match.groups()
+    return year + month + day
+
+
+def parse_date(value: Any, formats: Iterable[Optional[str]] = ()) -> Optional[date]:
+    """
+    Parse a date given as date/datetime or as text.
+
+    Args:
+        value: Value to parse
+        formats: strptime formats to try first; DD/MM/YYYY, YYYYMMDD and
+            YYYY-MM-DD are tried after them
+
+    Returns:
+        The date, or None if the value matches none of the formats
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for date_format in [f for f in formats if f] + list(_FALLBACK_FORMATS):
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
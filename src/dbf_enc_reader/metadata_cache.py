@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .cdx import CDXIndex
+from .raw_reader import RawDBFReader, resolve_table_file
+
+DEFAULT_CACHE_PATH = Path.home() / ".smart_dbf" / "table_metadata.json"
+
+# Bytes 0-31 hold version, last update date, record count and lengths
+SIGNATURE_HEADER_BYTES = 32
+
+
+class TableMetadataCache:
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Initialize the table metadata cache.
+
+        Entries are kept in memory and persisted to a JSON file. Each entry is
+        keyed by the absolute .DBF path and is only reused while the size,
+        mtime and header bytes of the .DBF (and the size and mtime of its .CDX)
+        are unchanged.
+
+        Args:
+            cache_path: Path to the persisted cache file (defaults to ~/.smart_dbf/table_metadata.json)
+        """
+        self.cache_path = Path(cache_path) if cache_path else DEFAULT_CACHE_PATH
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load persisted entries, ignoring a missing or corrupt cache file."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"Ignoring unreadable metadata cache {self.cache_path}: {str(e)}")
+            self.entries = {}
+
+    def _persist(self) -> None:
+        """Write all entries to disk atomically."""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not persist metadata cache {self.cache_path}: {str(e)}")
+
+    @staticmethod
+    def _signature(dbf_path: str, cdx_path: Optional[str]) -> Dict[str, Any]:
+        """Build the change-detection signature of a table's files."""
+        stat = os.stat(dbf_path)
+        with open(dbf_path, 'rb') as f:
+            header = f.read(SIGNATURE_HEADER_BYTES)
+        signature = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'header_sha1': hashlib.sha1(header).hexdigest(),
+            'cdx': None,
+        }
+        if cdx_path:
+            cdx_stat = os.stat(cdx_path)
+            signature['cdx'] = [cdx_stat.st_size, cdx_stat.st_mtime_ns]
+        return signature
+
+    @staticmethod
+    def _describe(dbf_path: str, cdx_path: Optional[str]) -> Dict[str, Any]:
+        """Read table metadata straight from the .DBF header and .CDX tag directory."""
+        with RawDBFReader(dbf_path) as raw:
+            metadata = {
+                'fields': [
+                    {'name': f.name, 'type': f.type, 'length': f.length, 'decimals': f.decimals}
+                    for f in raw.fields if f.type != '0'
+                ],
+                'record_count': raw.record_count,
+                'record_length': raw.record_length,
+                'header_length': raw.header_length,
+                'language_driver': raw.language_driver,
+                'codepage': raw.codepage,
+                'cdx_tags': [],
+            }
+        if cdx_path:
+            try:
+                with CDXIndex(cdx_path) as index:
+                    metadata['cdx_tags'] = [
+                        {'name': tag.name, 'expression': tag.expression, 'key_length': tag.key_length,
+                         'unique': tag.unique, 'descending': tag.descending, 'for': tag.for_expression}
+                        for tag in index.tags.values()
+                    ]
+            except (OSError, ValueError, struct.error) as e:
+                logging.warning(f"Could not read CDX tags from {cdx_path}: {str(e)}")
+        return metadata
+
+    def get(self, data_source: str, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of a table, re-reading the header only if the files changed.
+
+        Args:
+            data_source: Directory holding the tables
+            table_name: Table name with or without extension
+
+        Returns:
+            Metadata dictionary or None if the table file cannot be found
+        """
+        dbf_path = resolve_table_file(data_source, table_name)
+        if not dbf_path:
+            return None
+        cdx_path = resolve_table_file(data_source, table_name, '.CDX')
+        key = os.path.abspath(dbf_path)
+
+        signature = self._signature(dbf_path, cdx_path)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry.get('signature') == signature:
+                return entry['metadata']
+
+        metadata = self._describe(dbf_path, cdx_path)
+        with self._lock:
+            self.entries[key] = {'signature': signature, 'metadata': metadata}
+            self._persist()
+        return metadata
+
+    def invalidate(self, data_source: str, table_name: str) -> None:
+        """Drop the cached entry of a table."""
+        dbf_path = resolve_table_file(data_source, table_name)
+        if not dbf_path:
+            return
+        with self._lock:
+            if self.entries.pop(os.path.abspath(dbf_path), None) is not None:
+                self._persist()
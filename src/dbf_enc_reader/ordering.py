@@ -0,0 +1,172 @@
+import heapq
+import os
+import pickle
+import tempfile
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .dates import record_date_key
+
+SortKey = Callable[[Dict[str, Any]], Tuple]
+
+
+def sortable_value(value: Any) -> Tuple:
+    """Map a record value to a tuple that orders consistently across types."""
+    if value is None or value == '':
+        return (0,)
+    if isinstance(value, bool):
+        return (1, int(value))
+    if isinstance(value, (int, float, Decimal)):
+        return (1, value)
+    key = record_date_key(value)
+    if key is not None:
+        return (2, key)
+    return (3, str(value))
+
+
+def make_sort_key(fields: List[str]) -> SortKey:
+    """
+    Build a record sort key over the given fields.
+
+    Empty values sort first, numbers sort numerically and DD/MM/YYYY dates
+    sort chronologically.
+
+    Args:
+        fields: Field names, most significant first
+
+    Returns:
+        Key function taking a record dictionary
+    """
+    fields = list(fields)
+    return lambda record: tuple(sortable_value(record.get(field)) for field in fields)
+
+
+def _spill(run: Iterable[Dict[str, Any]], tmp_dir: Optional[str]) -> str:
+    """Write a sorted run to a temp file and return its path."""
+    fd, path = tempfile.mkstemp(prefix='smart_dbf_run_', suffix='.pkl', dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+        for record in run:
+            pickler.dump(record)
+            # Records are independent, don't let the memo grow with the run
+            pickler.clear_memo()
+    return path
+
+
+def _read_run(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        unpickler = pickle.Unpickler(f)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+
+def _remove(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _reduce_runs(run_paths: List[str], key: SortKey, max_fan_in: int, tmp_dir: Optional[str]) -> None:
+    """
+    Merge runs in passes until at most max_fan_in are left, in place.
+
+    Consecutive runs are merged together so equal keys keep their input order.
+    run_paths always lists the files on disk, so the caller can clean up.
+    """
+    while len(run_paths) > max_fan_in:
+        position = 0
+        while position < len(run_paths):
+            group = run_paths[position:position + max_fan_in]
+            if len(group) > 1:
+                merged = _spill(heapq.merge(*(_read_run(path) for path in group), key=key), tmp_dir)
+                run_paths[position:position + len(group)] = [merged]
+                _remove(group)
+            position += 1
+
+
+def external_sort(records: Iterable[Dict[str, Any]], key: SortKey, max_in_memory: int = 50000,
+                  tmp_dir: Optional[str] = None, max_fan_in: int = 64) -> Iterator[Dict[str, Any]]:
+    """
+    Sort a record stream with bounded memory.
+
+    Records are sorted in runs of at most max_in_memory rows. Runs are spilled
+    to temp files once the input outgrows a single run, merged in passes of
+    at most max_fan_in runs, then k-way merged. At most max_fan_in run files
+    are open at once. Temp files are removed when the returned iterator is
+    exhausted or closed.
+
+    Args:
+        records: Input records
+        key: Sort key function (see make_sort_key)
+        max_in_memory: Maximum number of records held in memory
+        tmp_dir: Optional directory for the spilled runs
+        max_fan_in: Maximum number of runs merged (and files open) at once
+
+    Yields:
+        Records in key order (stable for equal keys)
+    """
+    max_in_memory = max(1, max_in_memory)
+    max_fan_in = max(2, max_fan_in)
+    run_paths: List[str] = []
+    try:
+        run: List[Dict[str, Any]] = []
+        for record in records:
+            run.append(record)
+            if len(run) >= max_in_memory:
+                run.sort(key=key)
+                run_paths.append(_spill(run, tmp_dir))
+                run = []
+        run.sort(key=key)
+
+        if not run_paths:
+            yield from run
+            return
+        if run:
+            run_paths.append(_spill(run, tmp_dir))
+            run = []
+        _reduce_runs(run_paths, key, max_fan_in, tmp_dir)
+        yield from heapq.merge(*(_read_run(path) for path in run_paths), key=key)
+    finally:
+        _remove([path for path in run_paths if path])
+
+
+def merge_sorted(streams: Iterable[Iterable[Dict[str, Any]]], key: SortKey,
+                 dedup_key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    K-way merge of already sorted record streams, optionally dropping duplicates.
+
+    Duplicates are detected among records with the same sort key, so memory
+    stays bounded by the largest group of equal sort keys. Every duplicate is
+    caught when the sort fields are a subset of the dedup fields; the first
+    record in stream order wins.
+
+    Args:
+        streams: Record streams, each sorted by key
+        key: Sort key function the streams are sorted by
+        dedup_key: Optional function giving the identity of a record
+
+    Yields:
+        Records in key order
+    """
+    merged = heapq.merge(*streams, key=key)
+    if dedup_key is None:
+        yield from merged
+        return
+
+    current_key = None
+    seen = set()
+    for record in merged:
+        record_key = key(record)
+        if record_key != current_key:
+            current_key = record_key
+            seen = set()
+        identity = dedup_key(record)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        yield record
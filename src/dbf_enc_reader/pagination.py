@@ -0,0 +1,60 @@
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+def filter_signature(filters: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Get a short stable hash of a filter list.
+
+    Args:
+        filters: Filter dictionaries as built by FilterManager
+
+    Returns:
+        Hex digest identifying the filters (empty string when there are none)
+    """
+    if not filters:
+        return ''
+    # Compiled expressions serialize through their repr, which holds the source text
+    text = json.dumps(filters, sort_keys=True, default=repr)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class PageCursor(NamedTuple):
+    table: str
+    last_recno: int
+    filters: str
+
+    def encode(self) -> str:
+        """Encode the cursor as an opaque URL safe token."""
+        payload = json.dumps({'t': self.table, 'r': self.last_recno, 'f': self.filters}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @classmethod
+    def decode(cls, token: str) -> 'PageCursor':
+        """
+        Decode a token produced by encode.
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return cls(str(payload['t']), int(payload['r']), str(payload['f']))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+            raise ValueError(f"Invalid page cursor: {token!r}") from e
+
+    def check(self, table_name: str, filters: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        Make sure the cursor continues a read of the same table under the same filters.
+
+        Raises:
+            ValueError: If the cursor was issued for another table or filter set
+        """
+        if self.table.upper() != table_name.upper():
+            raise ValueError(f"Page cursor belongs to table {self.table}, not {table_name}")
+        if self.filters != filter_signature(filters):
+            raise ValueError("Page cursor was issued for different filters")
@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+# Marks the end of a stream between stages
+_END = object()
+
+
+class StageStats:
+    def __init__(self, name: str):
+        """
+        Counters of one pipeline stage.
+
+        Args:
+            name: Stage name
+        """
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.queue_max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def sample_queue(self, depth: int) -> None:
+        """Record the depth of the stage's output queue."""
+        self.queue_max_depth = max(self.queue_max_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.name,
+            'batches': self.batches,
+            'rows': self.rows,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'wait_seconds': round(self.wait_seconds, 3),
+            'rows_per_second': round(self.rows / self.busy_seconds, 1) if self.busy_seconds else None,
+            'queue_max_depth': self.queue_max_depth,
+            'queue_avg_depth': round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0,
+        }
+
+
+class ExtractionPipeline:
+    def __init__(self, produce: Callable[[], Iterator[Any]], convert: Callable[[Any], List[Dict[str, Any]]],
+                 sink: Callable[[List[Dict[str, Any]]], None], queue_size: int = 4,
+                 batch_rows: Callable[[Any], int] = len):
+        """
+        Initialize a read -> convert -> sink pipeline connected by bounded queues.
+
+        The reader and conversion stages run on their own threads so I/O waits
+        in the reader overlap with conversion and with the sink, which runs on
+        the calling thread.
+
+        Args:
+            produce: Callable returning an iterator of raw batches
+            convert: Callable turning a raw batch into a list of records
+            sink: Callable consuming a list of records
+            queue_size: Maximum number of batches buffered between two stages
+            batch_rows: Callable returning the number of rows in a raw batch
+        """
+        self.produce = produce
+        self.convert = convert
+        self.sink = sink
+        self.queue_size = max(1, queue_size)
+        self.batch_rows = batch_rows
+        self.stats = {name: StageStats(name) for name in ('read', 'convert', 'sink')}
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _put(self, out_queue: "queue.Queue", item: Any, stats: StageStats) -> bool:
+        """Put an item downstream, giving up if the pipeline is stopping."""
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                stats.wait_seconds += time.perf_counter() - started
+                stats.sample_queue(out_queue.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, in_queue: "queue.Queue", stats: StageStats) -> Any:
+        """Take the next item from upstream, returning _END if the pipeline is stopping."""
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                item = in_queue.get(timeout=0.1)
+                stats.wait_seconds += time.perf_counter() - started
+                return item
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, error: BaseException) -> None:
+        self._errors.append(error)
+        self._stop.set()
+
+    def _read_stage(self, out_queue: "queue.Queue") -> None:
+        stats = self.stats['read']
+        batches = None
+        try:
+            batches = iter(self.produce())
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                batch = next(batches, _END)
+                stats.busy_seconds += time.perf_counter() - started
+                if batch is _END:
+                    break
+                stats.batches += 1
+                stats.rows += self.batch_rows(batch)
+                if not self._put(out_queue, batch, stats):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # Close the producer on this thread so it releases its reader/connection here
+            if hasattr(batches, 'close'):
+                batches.close()
+            self._put(out_queue, _END, stats)
+
+    def _convert_stage(self, in_queue: "queue.Queue", out_queue: "queue.Queue") -> None:
+        stats = self.stats['convert']
+        try:
+            while True:
+                batch = self._get(in_queue, stats)
+                if batch is _END:
+                    break
+                started = time.perf_counter()
+                records = self.convert(batch)
+                stats.busy_seconds += time.perf_counter() - started
+                stats.batches += 1
+                stats.rows += len(records)
+                if records and not self._put(out_queue, records, stats):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(out_queue, _END, stats)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the pipeline to completion.
+
+        Returns:
+            Dictionary with the total row count, wall time and per-stage stats
+
+        Raises:
+            The first exception raised by any stage
+        """
+        raw_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        record_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        started = time.perf_counter()
+
+        workers = [
+            threading.Thread(target=self._read_stage, args=(raw_queue,), name='dbf-read', daemon=True),
+            threading.Thread(target=self._convert_stage, args=(raw_queue, record_queue), name='dbf-convert', daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        stats = self.stats['sink']
+        try:
+            while True:
+                records = self._get(record_queue, stats)
+                if records is _END:
+                    break
+                sink_started = time.perf_counter()
+                self.sink(records)
+                stats.busy_seconds += time.perf_counter() - sink_started
+                stats.batches += 1
+                stats.rows += len(records)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for worker in workers:
+                worker.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        return {
+            'rows': stats.rows,
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'stages': [stage.to_dict() for stage in self.stats.values()],
+        }
+
+
+def batched(items: Iterator[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group an iterator into lists of at most batch_size items."""
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,371 @@
+import os
+import struct
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Any, Optional, Iterator, Tuple, NamedTuple, Callable, BinaryIO
+
+from .converters import DataConverter
+from .dates import format_record_date
+
+# DBF language driver byte (header offset 29) to Python codec
+LANGUAGE_DRIVER_CODEPAGES = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252', 0x04: 'mac_roman',
+    0x08: 'cp865', 0x09: 'cp437', 0x0A: 'cp850', 0x0B: 'cp437',
+    0x0D: 'cp437', 0x0E: 'cp850', 0x0F: 'cp437', 0x10: 'cp850',
+    0x11: 'cp437', 0x12: 'cp850', 0x13: 'cp932', 0x14: 'cp850',
+    0x15: 'cp437', 0x16: 'cp850', 0x17: 'cp865', 0x18: 'cp437',
+    0x19: 'cp437', 0x1A: 'cp850', 0x1B: 'cp437', 0x1C: 'cp863',
+    0x1D: 'cp850', 0x1F: 'cp852', 0x22: 'cp852', 0x23: 'cp852',
+    0x24: 'cp860', 0x25: 'cp850', 0x26: 'cp866', 0x37: 'cp850',
+    0x40: 'cp852', 0x4D: 'cp936', 0x4E: 'cp949', 0x4F: 'cp950',
+    0x50: 'cp874', 0x57: 'cp1252', 0x58: 'cp1252', 0x59: 'cp1252',
+    0x64: 'cp852', 0x65: 'cp866', 0x66: 'cp865', 0x67: 'cp861',
+    0x6A: 'cp737', 0x6B: 'cp857', 0x78: 'cp950', 0x79: 'cp949',
+    0x7A: 'cp936', 0x7B: 'cp932', 0x7C: 'cp874', 0x7D: 'cp1255',
+    0x7E: 'cp1256', 0x96: 'mac_cyrillic', 0x97: 'mac_latin2',
+    0x98: 'mac_greek', 0xC8: 'cp1250', 0xC9: 'cp1251', 0xCA: 'cp1254',
+    0xCB: 'cp1253', 0xCC: 'cp1257',
+}
+
+# Tables without a language driver byte are OEM, which is cp850 for our POS data
+DEFAULT_CODEPAGE = 'cp850'
+
+# Visual FoxPro table versions store memo pointers and extra types in binary
+VFP_VERSIONS = (0x30, 0x31, 0x32)
+
+JULIAN_DAY_OFFSET = 1721425
+
+# Field types holding numbers (the rest compare as text or dates)
+NUMERIC_FIELD_TYPES = ('N', 'F', 'I', 'B', 'Y')
+
+# First byte of every record: '*' when the record is flagged as deleted
+DELETED_FLAG = b'*'
+
+
+# Anything with a fields list and a mask(columns, size) method, e.g. CompiledExpression
+RowFilter = Any
+
+
+class FieldDescriptor(NamedTuple):
+    name: str
+    type: str
+    length: int
+    decimals: int
+    offset: int
+
+
+def resolve_table_file(data_source: str, table_name: str, extension: str = '.DBF') -> Optional[str]:
+    """
+    Find a table file in a data directory, ignoring case.
+
+    Args:
+        data_source: Directory holding the tables (or the .DBF path itself)
+        table_name: Table name with or without extension
+        extension: File extension to look for (.DBF, .CDX, .FPT)
+
+    Returns:
+        Full path of the file or None if it does not exist
+    """
+    if os.path.isfile(data_source) and extension.upper() == '.DBF':
+        return data_source
+    directory = data_source if os.path.isdir(data_source) else os.path.dirname(data_source)
+    base_name = os.path.splitext(os.path.basename(table_name))[0]
+    wanted = f"{base_name}{extension}".upper()
+    try:
+        for entry in os.listdir(directory):
+            if entry.upper() == wanted:
+                return os.path.join(directory, entry)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+class RawDBFReader:
+    def __init__(self, path: str, codepage: Optional[str] = None, converter: Optional[DataConverter] = None,
+                 opener: Optional[Callable[[str], BinaryIO]] = None):
+        """
+        Open an unencrypted DBF file for direct reading, without the Advantage provider.
+
+        Args:
+            path: Path to the .DBF file
+            codepage: Python codec to decode text with (defaults to the language driver byte)
+            converter: DataConverter used for bulk text decoding
+            opener: Optional callable opening files for binary reading (e.g. ReadAheadFile)
+        """
+        self.path = path
+        self.converter = converter or DataConverter()
+        self.opener = opener or (lambda file_path: open(file_path, 'rb'))
+        self.file = self.opener(path)
+        self._memo_file = None
+        self._memo_block_size = 0
+        try:
+            self._read_header()
+        except Exception:
+            self.file.close()
+            raise
+        self.codepage = codepage or LANGUAGE_DRIVER_CODEPAGES.get(self.language_driver, DEFAULT_CODEPAGE)
+
+    def _read_header(self) -> None:
+        """Parse the table header and field descriptors."""
+        header = self.file.read(32)
+        if len(header) < 32:
+            raise ValueError(f"Not a DBF file: {self.path}")
+
+        self.version = header[0]
+        self.last_update = header[1:4]
+        self.record_count, self.header_length, self.record_length = struct.unpack('<IHH', header[4:12])
+        self.language_driver = header[29]
+
+        descriptors = self.file.read(self.header_length - 32)
+        self.fields: List[FieldDescriptor] = []
+        offset = 1  # byte 0 of every record is the deletion flag
+        for pos in range(0, len(descriptors) - 31, 32):
+            if descriptors[pos] == 0x0D:
+                break
+            raw = descriptors[pos:pos + 32]
+            name = raw[:11].split(b'\x00', 1)[0].decode('ascii', errors='replace').strip()
+            field_type = chr(raw[11]).upper()
+            length, decimals = raw[16], raw[17]
+            self.fields.append(FieldDescriptor(name, field_type, length, decimals, offset))
+            offset += length
+
+    @property
+    def is_vfp(self) -> bool:
+        return self.version in VFP_VERSIONS
+
+    def field_names(self) -> List[str]:
+        """Get the user visible field names (VFP system fields are skipped)."""
+        return [f.name for f in self.fields if f.type != '0']
+
+    def select_fields(self, fields: Optional[List[str]] = None) -> List[FieldDescriptor]:
+        """
+        Resolve requested field names to descriptors.
+
+        Args:
+            fields: Optional list of field names (all fields if omitted)
+
+        Returns:
+            List of field descriptors in table order
+        """
+        visible = [f for f in self.fields if f.type != '0']
+        if not fields:
+            return visible
+        wanted = {name.upper() for name in fields}
+        selected = [f for f in visible if f.name.upper() in wanted]
+        missing = wanted - {f.name.upper() for f in selected}
+        if missing:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(missing))}")
+        return selected
+
+    def iter_raw_batches(self, batch_size: int = 2048, start_recno: int = 1) -> Iterator[Tuple[int, bytes]]:
+        """
+        Read the record area in large sequential blocks.
+
+        Args:
+            batch_size: Number of records per block
+            start_recno: Record number to start from (1 based)
+
+        Yields:
+            Tuples of (record number of the first record, raw block bytes)
+        """
+        recno = max(start_recno, 1)
+        self.file.seek(self.header_length + (recno - 1) * self.record_length)
+        while recno <= self.record_count:
+            count = min(batch_size, self.record_count - recno + 1)
+            block = self.file.read(count * self.record_length)
+            count = len(block) // self.record_length
+            if not count:
+                break
+            yield recno, block[:count * self.record_length]
+            recno += count
+
+    def decode_batch(self, first_recno: int, block: bytes, fields: Optional[List[FieldDescriptor]] = None,
+                     where: Optional[RowFilter] = None, deleted: Optional[bool] = False) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Decode a raw block column by column.
+
+        The deletion flags are checked before anything is decoded. When a row
+        filter is given, only the columns it references are decoded next; the
+        remaining columns are decoded for the rows that pass.
+
+        Args:
+            first_recno: Record number of the first record in the block
+            block: Raw record bytes as returned by iter_raw_batches
+            fields: Field descriptors to decode (all fields if omitted)
+            where: Optional filter with a fields list and a mask(columns, size) method
+            deleted: False to skip deleted records, True to return only deleted
+                records, None to return every record
+
+        Returns:
+            List of (record number, record dictionary) tuples
+        """
+        fields = fields if fields is not None else self.select_fields()
+        reclen = self.record_length
+        starts = list(range(0, len(block), reclen))
+        recnos = list(range(first_recno, first_recno + len(starts)))
+        decoded: Dict[str, List[Any]] = {}
+
+        if deleted is not None:
+            # One byte per record, sliced out of the block in a single step
+            flags = block[0::reclen]
+            if deleted or DELETED_FLAG in flags:
+                keep = [i for i, flag in enumerate(flags) if (flag == DELETED_FLAG[0]) == deleted]
+                starts = [starts[i] for i in keep]
+                recnos = [recnos[i] for i in keep]
+            if not starts:
+                return []
+
+        if where is not None:
+            for field in self.select_fields(where.fields):
+                decoded[field.name.upper()] = self._decode_field(field, block, starts)
+            mask = where.mask(decoded, len(starts))
+            keep = [i for i, passed in enumerate(mask) if passed]
+            if len(keep) != len(starts):
+                starts = [starts[i] for i in keep]
+                recnos = [recnos[i] for i in keep]
+                decoded = {name: [column[i] for i in keep] for name, column in decoded.items()}
+
+        columns = []
+        for field in fields:
+            column = decoded.get(field.name.upper())
+            columns.append(column if column is not None else self._decode_field(field, block, starts))
+
+        names = [field.name for field in fields]
+        if not columns:
+            return [(recno, {}) for recno in recnos]
+        return [(recno, dict(zip(names, row))) for recno, row in zip(recnos, zip(*columns))]
+
+    def _decode_field(self, field: FieldDescriptor, block: bytes, starts: List[int]) -> List[Any]:
+        """Slice one field out of every record of a block and decode it."""
+        lo, hi = field.offset, field.offset + field.length
+        return self._decode_column(field, [block[start + lo:start + hi] for start in starts])
+
+    def iter_records(self, fields: Optional[List[str]] = None, start_recno: int = 1,
+                     batch_size: int = 2048, where: Optional[RowFilter] = None,
+                     deleted: Optional[bool] = False) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Stream decoded records with their record numbers.
+
+        Args:
+            fields: Optional list of field names to decode (all fields if omitted)
+            start_recno: Record number to start from (1 based)
+            batch_size: Number of records decoded per column batch
+            where: Optional filter evaluated on the column batch before full decoding
+            deleted: False to skip deleted records, True for only deleted records, None for all
+
+        Yields:
+            Tuples of (record number, record dictionary)
+        """
+        selected = self.select_fields(fields)
+        for first_recno, block in self.iter_raw_batches(batch_size, start_recno):
+            yield from self.decode_batch(first_recno, block, selected, where, deleted)
+
+    def read_record(self, recno: int, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read a single record by record number.
+
+        Returns:
+            Record dictionary or None if the record number is out of range or deleted
+        """
+        if recno < 1 or recno > self.record_count:
+            return None
+        self.file.seek(self.header_length + (recno - 1) * self.record_length)
+        block = self.file.read(self.record_length)
+        # Check the flag of this record only, never move on to the next live one
+        if len(block) < self.record_length or block[:1] == DELETED_FLAG:
+            return None
+        return self.decode_batch(recno, block, self.select_fields(fields), deleted=None)[0][1]
+
+    def _decode_column(self, field: FieldDescriptor, raw_values: List[bytes]) -> List[Any]:
+        """Convert one column of raw values to Python values."""
+        field_type = field.type
+        if field_type in ('C', 'V'):
+            return self.converter.decode_text_batch([value.strip() for value in raw_values], self.codepage)
+        if field_type in ('N', 'F'):
+            return [self._parse_number(value, field.decimals) for value in raw_values]
+        if field_type == 'D':
+            return [self._parse_date(value) for value in raw_values]
+        if field_type == 'L':
+            return [self._parse_logical(value) for value in raw_values]
+        if field_type == 'I':
+            return [struct.unpack('<i', value)[0] for value in raw_values]
+        if field_type == 'B' and self.is_vfp:
+            return [struct.unpack('<d', value)[0] for value in raw_values]
+        if field_type == 'Y':
+            return [Decimal(struct.unpack('<q', value)[0]).scaleb(-4) for value in raw_values]
+        if field_type in ('T', '@'):
+            return [self._parse_datetime(value) for value in raw_values]
+        if field_type in ('M', 'G', 'B', 'W'):
+            return [self._read_memo(value) for value in raw_values]
+        return self.converter.decode_text_batch([value.strip() for value in raw_values], self.codepage)
+
+    @staticmethod
+    def _parse_number(value: bytes, decimals: int) -> Any:
+        text = value.strip()
+        if not text or text.startswith(b'*'):
+            return None
+        try:
+            if decimals == 0 and b'.' not in text:
+                return int(text)
+            # Decimal so amounts keep their exact digits (a float would turn 0.1 into 0.1000000000000000055)
+            return Decimal(text.decode('ascii'))
+        except (ValueError, InvalidOperation):
+            return None
+
+    @staticmethod
+    def _parse_date(value: bytes) -> Optional[str]:
+        text = value.strip()
+        if len(text) != 8 or not text.isdigit():
+            return None
+        # DD/MM/YYYY like format_record_date, sliced from the YYYYMMDD bytes without parsing
+        return f"{text[6:8].decode()}/{text[4:6].decode()}/{text[:4].decode()}"
+
+    @staticmethod
+    def _parse_logical(value: bytes) -> Optional[bool]:
+        flag = value[:1].upper()
+        if flag in (b'T', b'Y'):
+            return True
+        if flag in (b'F', b'N'):
+            return False
+        return None
+
+    @staticmethod
+    def _parse_datetime(value: bytes) -> Optional[str]:
+        julian_day, _ = struct.unpack('<ii', value[:8])
+        if julian_day <= 0:
+            return None
+        day = date.fromordinal(julian_day - JULIAN_DAY_OFFSET)
+        return format_record_date(day)
+
+    def _read_memo(self, pointer: bytes) -> Optional[str]:
+        """Read a memo value from the table's .FPT file."""
+        if self.is_vfp and len(pointer) == 4:
+            block = struct.unpack('<i', pointer)[0]
+        else:
+            text = pointer.strip()
+            block = int(text) if text.isdigit() else 0
+        if block <= 0:
+            return None
+
+        if self._memo_file is None:
+            memo_path = resolve_table_file(os.path.dirname(self.path), os.path.basename(self.path), '.FPT')
+            if not memo_path:
+                return None
+            self._memo_file = self.opener(memo_path)
+            self._memo_block_size = struct.unpack('>H', self._memo_file.read(8)[6:8])[0] or 64
+
+        self._memo_file.seek(block * self._memo_block_size)
+        _, length = struct.unpack('>II', self._memo_file.read(8))
+        data = self._memo_file.read(length)
+        return self.converter.decode_text_batch([data.strip()], self.codepage)[0]
+
+    def close(self) -> None:
+        self.file.close()
+        if self._memo_file:
+            self._memo_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
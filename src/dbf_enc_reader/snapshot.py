@@ -0,0 +1,295 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .raw_reader import resolve_table_file
+
+TABLE_EXTENSIONS = ('.DBF', '.CDX', '.FPT')
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), "smart_dbf_snapshots")
+
+
+def table_files(data_source: str, table_name: str) -> List[str]:
+    """
+    Get the existing files (.DBF, .CDX, .FPT) that make up a table.
+
+    Args:
+        data_source: Directory holding the tables
+        table_name: Table name with or without extension
+
+    Returns:
+        List of full file paths
+    """
+    paths = [resolve_table_file(data_source, table_name, extension) for extension in TABLE_EXTENSIONS]
+    return [path for path in paths if path]
+
+
+def _file_signature(paths: List[str]) -> Dict[str, Tuple[int, int]]:
+    signature = {}
+    for path in paths:
+        stat = os.stat(path)
+        signature[os.path.basename(path)] = (stat.st_size, stat.st_mtime_ns)
+    return signature
+
+
+class TableSnapshot:
+    MANIFEST_SUFFIX = '.snapshot.json'
+
+    # Snapshot directories handed out by create() and not released yet, shared by
+    # every TableSnapshot of the process so one never deletes a copy another reads
+    _in_use: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, data_source: str, snapshot_dir: Optional[str] = None,
+                 chunk_size: int = 8 * 1024 * 1024, retries: int = 3, retry_delay: float = 1.0):
+        """
+        Initialize local snapshots of tables living on a network share.
+
+        Each source directory gets its own folder under snapshot_dir, and each
+        copy of a table its own version folder inside it, so a reader keeps a
+        consistent copy while newer ones are taken. A table is copied again only
+        when its source files changed since the last snapshot.
+
+        Args:
+            data_source: Source directory holding the tables
+            snapshot_dir: Local directory for the copies (defaults to the temp directory)
+            chunk_size: Size of each sequential read from the share
+            retries: Number of copy attempts when the files change during the copy
+            retry_delay: Seconds to wait before retrying a copy
+        """
+        self.data_source = data_source
+        source_key = hashlib.sha1(os.path.abspath(data_source).encode('utf-8')).hexdigest()[:12]
+        self.local_dir = os.path.join(snapshot_dir or DEFAULT_SNAPSHOT_DIR, source_key)
+        self.chunk_size = chunk_size
+        self.retries = max(1, retries)
+        self.retry_delay = retry_delay
+
+    @staticmethod
+    def _base_name(table_name: str) -> str:
+        return os.path.splitext(os.path.basename(table_name))[0].upper()
+
+    def _manifest_path(self, table_name: str) -> str:
+        return os.path.join(self.local_dir, self._base_name(table_name) + self.MANIFEST_SUFFIX)
+
+    def _load_manifest(self, table_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path(table_name), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return manifest if isinstance(manifest, dict) and 'dir' in manifest else None
+
+    def _save_manifest(self, table_name: str, version: str, signature: Dict[str, Tuple[int, int]]) -> None:
+        path = self._manifest_path(table_name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'dir': version, 'files': signature}, f)
+        os.replace(path + '.tmp', path)
+
+    def _current_version(self, table_name: str) -> Optional[str]:
+        manifest = self._load_manifest(table_name)
+        return os.path.join(self.local_dir, manifest['dir']) if manifest else None
+
+    def _copy_file(self, source: str, target: str) -> None:
+        """Copy one file with large sequential reads."""
+        tmp_target = target + '.part'
+        with open(source, 'rb', buffering=0) as src, open(tmp_target, 'wb') as dst:
+            while True:
+                chunk = src.read(self.chunk_size)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(tmp_target, target)
+
+    def _acquire(self, directory: str) -> str:
+        with self._lock:
+            self._in_use[directory] = self._in_use.get(directory, 0) + 1
+        return directory
+
+    def create(self, table_name: str) -> str:
+        """
+        Make sure a consistent local copy of a table exists and hold on to it.
+
+        The returned directory stays untouched until it is given back with
+        release(), even if newer snapshots of the table are taken meanwhile.
+
+        Args:
+            table_name: Table name with or without extension
+
+        Returns:
+            Local directory that can be used as data source for the table
+
+        Raises:
+            FileNotFoundError: If the table does not exist in the source
+            RuntimeError: If the files kept changing during every copy attempt
+        """
+        sources = table_files(self.data_source, table_name)
+        if not sources or not sources[0].upper().endswith('.DBF'):
+            raise FileNotFoundError(f"Table file not found for {table_name} in {self.data_source}")
+        os.makedirs(self.local_dir, exist_ok=True)
+
+        before = _file_signature(sources)
+        manifest = self._load_manifest(table_name)
+        if manifest:
+            directory = os.path.join(self.local_dir, manifest['dir'])
+            if {name: tuple(sig) for name, sig in manifest['files'].items()} == before \
+                    and all(os.path.exists(os.path.join(directory, name)) for name in before):
+                return self._acquire(directory)
+
+        version = f"{self._base_name(table_name)}.{time.time_ns():x}"
+        directory = os.path.join(self.local_dir, version)
+        os.makedirs(directory)
+        # Held from the start so a concurrent cleanup() leaves the copy in progress alone
+        self._acquire(directory)
+        for attempt in range(1, self.retries + 1):
+            started = time.perf_counter()
+            for source in sources:
+                self._copy_file(source, os.path.join(directory, os.path.basename(source)))
+            after = _file_signature(sources)
+            if after == before:
+                self._save_manifest(table_name, version, after)
+                logging.info(f"Snapshot of {table_name} copied in {time.perf_counter() - started:.2f}s")
+                self.cleanup(table_name)
+                return directory
+
+            logging.warning(f"{table_name} changed while copying (attempt {attempt}/{self.retries})")
+            before = after
+            time.sleep(self.retry_delay)
+
+        self.release(directory)
+        raise RuntimeError(f"Could not take a consistent snapshot of {table_name}: files kept changing")
+
+    def release(self, directory: str) -> None:
+        """
+        Give back a directory returned by create().
+
+        The latest copy of a table is kept for the next reader; older copies
+        are deleted once nobody in this process reads them.
+        """
+        with self._lock:
+            count = self._in_use.get(directory, 0) - 1
+            if count > 0:
+                self._in_use[directory] = count
+                return
+            self._in_use.pop(directory, None)
+        table_name = os.path.basename(directory).rsplit('.', 1)[0]
+        if directory != self._current_version(table_name):
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def cleanup(self, table_name: Optional[str] = None) -> None:
+        """
+        Delete the copies nobody reads anymore, keeping the latest copy of each table.
+
+        Args:
+            table_name: Only clean up this table (all tables of the source if omitted)
+        """
+        try:
+            entries = list(os.scandir(self.local_dir))
+        except FileNotFoundError:
+            return
+        prefix = self._base_name(table_name) + '.' if table_name else ''
+        for entry in entries:
+            if not entry.is_dir() or not entry.name.startswith(prefix):
+                continue
+            if entry.path == self._current_version(entry.name.rsplit('.', 1)[0]):
+                continue
+            with self._lock:
+                if self._in_use.get(entry.path):
+                    continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class ReadAheadFile(io.RawIOBase):
+    def __init__(self, path: str, block_size: int = 64 * 1024, read_ahead: int = 8, max_blocks: int = 256):
+        """
+        Read-only file wrapper with an LRU block cache and sequential read-ahead.
+
+        A cache miss reads the missing block plus the following read_ahead
+        blocks in a single I/O, turning many small remote reads into few large ones.
+
+        Args:
+            path: Path of the file to read
+            block_size: Size of a cached block
+            read_ahead: Number of extra blocks fetched on a miss
+            max_blocks: Maximum number of blocks kept in memory
+        """
+        super().__init__()
+        self.path = path
+        self.block_size = block_size
+        self.read_ahead = read_ahead
+        self.max_blocks = max(max_blocks, read_ahead + 1)
+        self.file = open(path, 'rb', buffering=0)
+        self.blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self.position = 0
+        self.hits = 0
+        self.misses = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = os.fstat(self.file.fileno()).st_size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def _block(self, index: int) -> bytes:
+        block = self.blocks.get(index)
+        if block is not None:
+            self.hits += 1
+            self.blocks.move_to_end(index)
+            return block
+
+        self.misses += 1
+        self.file.seek(index * self.block_size)
+        data = self.file.read(self.block_size * (self.read_ahead + 1))
+        for i in range(0, len(data), self.block_size):
+            self.blocks[index + i // self.block_size] = data[i:i + self.block_size]
+            self.blocks.move_to_end(index + i // self.block_size)
+        while len(self.blocks) > self.max_blocks:
+            self.blocks.popitem(last=False)
+        return self.blocks.get(index, b'')
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = os.fstat(self.file.fileno()).st_size - self.position
+        chunks = []
+        while size > 0:
+            index, offset = divmod(self.position, self.block_size)
+            block = self._block(index)
+            chunk = block[offset:offset + size]
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self.position += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.file.close()
+            self.blocks.clear()
+        super().close()
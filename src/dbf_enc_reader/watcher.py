@@ -0,0 +1,375 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Only these files decide whether a table has to be extracted again
+WATCHED_EXTENSIONS = ('.DBF', '.CDX')
+
+TableKey = Tuple[str, str]
+ChangeHandler = Callable[[str, str], None]
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Filesystems where inotify accepts a watch but never reports writes made by other hosts
+NETWORK_FILESYSTEMS = ('cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'afs', 'ncpfs', '9p', 'fuse.sshfs')
+
+
+def _table_of(file_name: str, tables: Set[str]) -> Optional[str]:
+    """Get the watched table a file belongs to, if any."""
+    base_name, extension = os.path.splitext(file_name)
+    if extension.upper() not in WATCHED_EXTENSIONS:
+        return None
+    table = base_name.upper()
+    return table if table in tables else None
+
+
+def scan_signatures(directory: str, tables: Set[str]) -> Dict[str, Tuple[Tuple[str, int, int], ...]]:
+    """
+    Stat the .DBF/.CDX files of the watched tables in one directory listing.
+
+    Args:
+        directory: Directory holding the tables
+        tables: Upper case table names without extension
+
+    Returns:
+        Dictionary of table name to its (file name, size, mtime) tuples
+    """
+    found: Dict[str, List[Tuple[str, int, int]]] = {}
+    try:
+        entries = list(os.scandir(directory))
+    except OSError as e:
+        logging.warning(f"Cannot list {directory}: {str(e)}")
+        return {}
+    for entry in entries:
+        table = _table_of(entry.name, tables)
+        if table is None:
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        found.setdefault(table, []).append((entry.name.upper(), stat.st_size, stat.st_mtime_ns))
+    return {table: tuple(sorted(files)) for table, files in found.items()}
+
+
+def _unescape_mount_path(path: str) -> str:
+    """Undo the octal escapes (spaces, tabs...) of a /proc/mounts path."""
+    return re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), path)
+
+
+def filesystem_type(directory: str, mounts_file: str = '/proc/mounts') -> Optional[str]:
+    """
+    Get the type of the filesystem a directory lives on.
+
+    Args:
+        directory: Directory to look up
+        mounts_file: Mount table to read
+
+    Returns:
+        Filesystem type (e.g. 'ext4', 'cifs'), or None if it can't be told
+    """
+    try:
+        with open(mounts_file, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    path = os.path.realpath(directory)
+    best_mount, best_type = '', None
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        mount_point, fs_type = _unescape_mount_path(parts[1]), parts[2]
+        inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+        # The deepest mount point holding the directory wins
+        if inside and len(mount_point) >= len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type
+
+
+def is_network_filesystem(directory: str) -> bool:
+    """Check whether a directory is on a network share, where inotify misses remote writes."""
+    fs_type = filesystem_type(directory)
+    return fs_type is not None and fs_type.lower() in NETWORK_FILESYSTEMS
+
+
+class PollingSource:
+    def __init__(self, directories: List[str], tables: Set[str], interval: float = 2.0):
+        """
+        Change source comparing file sizes and mtimes at a fixed interval.
+
+        Works everywhere, including network shares where inotify sees nothing.
+
+        Args:
+            directories: Directories to watch
+            tables: Upper case table names without extension
+            interval: Seconds between two scans
+        """
+        self.directories = directories
+        self.tables = tables
+        self.interval = interval
+        self.signatures = {directory: scan_signatures(directory, tables) for directory in directories}
+        self._next_scan = time.monotonic() + interval
+
+    def wait(self, timeout: float) -> List[TableKey]:
+        """Wait up to timeout seconds and return the tables seen changing."""
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return []
+        time.sleep(max(0.0, delay))
+        self._next_scan = time.monotonic() + self.interval
+
+        changed = []
+        for directory in self.directories:
+            current = scan_signatures(directory, self.tables)
+            previous = self.signatures.get(directory, {})
+            changed.extend((directory, table) for table in current if current[table] != previous.get(table))
+            self.signatures[directory] = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, directories: List[str], tables: Set[str]):
+        """
+        Change source using Linux inotify, so idle directories cost no I/O.
+
+        Raises:
+            OSError: If inotify is not available or a directory can't be watched
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.tables = tables
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: Dict[int, str] = {}
+        try:
+            for directory in directories:
+                wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+                self.directories[wd] = directory
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout: float) -> List[TableKey]:
+        """Wait up to timeout seconds and return the tables seen changing."""
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, _, _, name_length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + name_length].rstrip(b'\x00'))
+            pos += name_length
+            directory = self.directories.get(wd)
+            table = _table_of(name, self.tables) if directory and name else None
+            if table is not None and (directory, table) not in changed:
+                changed.append((directory, table))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class CombinedSource:
+    def __init__(self, sources: List):
+        """
+        Change source merging several sources, e.g. inotify for local
+        directories and polling for directories on network shares.
+        """
+        self.sources = sources
+
+    def wait(self, timeout: float) -> List[TableKey]:
+        """Wait up to timeout seconds and return the tables seen changing."""
+        # Only the first source blocks, the others are checked without waiting
+        changed = self.sources[0].wait(min(timeout, self._next_poll()))
+        for source in self.sources[1:]:
+            changed.extend(key for key in source.wait(0.0) if key not in changed)
+        return changed
+
+    def _next_poll(self) -> float:
+        delays = [source._next_scan - time.monotonic() for source in self.sources
+                  if isinstance(source, PollingSource)]
+        return max(0.0, min(delays)) if delays else float('inf')
+
+    def close(self) -> None:
+        for source in self.sources:
+            source.close()
+
+
+class TableWatcher:
+    def __init__(self, directories: Iterable[str], tables: Iterable[str], on_change: ChangeHandler,
+                 debounce: float = 2.0, max_workers: int = 2, poll_interval: float = 2.0,
+                 use_inotify: bool = True, retry_delay: float = 10.0):
+        """
+        Watch branch directories and re-extract tables after their files change.
+
+        Writes arriving in bursts are coalesced: a table is handed to on_change
+        once no write was seen for debounce seconds. A table is only handed over
+        when its .DBF/.CDX size or mtime differ from the last run, and never
+        twice at the same time. A table whose on_change failed is handed over
+        again after retry_delay seconds, even if it is not written meanwhile.
+
+        Args:
+            directories: Branch data directories to watch
+            tables: Table names, with or without .DBF extension
+            on_change: Called as on_change(directory, table_name) from a worker thread
+            debounce: Quiet period in seconds before a changed table is handled
+            max_workers: Maximum number of tables handled at the same time
+            poll_interval: Seconds between scans when polling
+            use_inotify: Use inotify when available instead of polling (directories
+                on network shares are always polled)
+            retry_delay: Seconds to wait before retrying a table whose on_change failed
+        """
+        self.directories = list(dict.fromkeys(directories))
+        self.tables = {os.path.splitext(table)[0].upper() for table in tables}
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_workers = max(1, max_workers)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.retry_delay = retry_delay
+
+        self._pending: Dict[TableKey, float] = {}
+        self._running: Set[TableKey] = set()
+        self._handled: Dict[TableKey, Tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _open_source(self):
+        if not self.use_inotify:
+            return PollingSource(self.directories, self.tables, self.poll_interval)
+
+        # inotify only sees writes made through this host's kernel, network shares are polled
+        remote = [directory for directory in self.directories if is_network_filesystem(directory)]
+        local = [directory for directory in self.directories if directory not in remote]
+        for directory in remote:
+            logging.info(f"{directory} is on a network share, polling it every {self.poll_interval}s")
+        if not local:
+            return PollingSource(remote, self.tables, self.poll_interval)
+        try:
+            inotify = InotifySource(local, self.tables)
+        except OSError as e:
+            logging.info(f"inotify unavailable ({str(e)}), polling every {self.poll_interval}s")
+            return PollingSource(self.directories, self.tables, self.poll_interval)
+        if not remote:
+            return inotify
+        return CombinedSource([inotify, PollingSource(remote, self.tables, self.poll_interval)])
+
+    def _signature(self, key: TableKey) -> Tuple:
+        directory, table = key
+        return scan_signatures(directory, {table}).get(table, ())
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        if self._thread is not None:
+            return
+        # Current file state is the baseline, only later changes trigger a run
+        for directory in self.directories:
+            for table, signature in scan_signatures(directory, self.tables).items():
+                self._handled[(directory, table)] = signature
+        self._source = self._open_source()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='table-watcher')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='table-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop watching, optionally waiting for running extractions to finish."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._executor.shutdown(wait=wait)
+        self._source.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                deadlines = [deadline for key, deadline in self._pending.items() if key not in self._running]
+            timeout = min(deadlines) - now if deadlines else self.poll_interval
+            # Wake up regularly so stop() is honored
+            changed = self._source.wait(min(max(0.0, timeout), 1.0))
+
+            now = time.monotonic()
+            with self._lock:
+                for key in changed:
+                    self._pending[key] = now + self.debounce
+                due = [key for key, deadline in self._pending.items()
+                       if deadline <= now and key not in self._running]
+                for key in due:
+                    del self._pending[key]
+            for key in due:
+                self._dispatch(key)
+
+    def _dispatch(self, key: TableKey) -> None:
+        signature = self._signature(key)
+        with self._lock:
+            if not signature or signature == self._handled.get(key):
+                return
+            self._running.add(key)
+        self._executor.submit(self._handle, key, signature)
+
+    def _handle(self, key: TableKey, signature: Tuple) -> None:
+        directory, table = key
+        started = time.perf_counter()
+        try:
+            self.on_change(directory, table)
+            with self._lock:
+                self._handled[key] = signature
+            logging.info(f"Re-extracted {table} from {directory} in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logging.error(f"Re-extraction of {table} from {directory} failed, retrying in {self.retry_delay}s: {str(e)}")
+            with self._lock:
+                # Retry even without another write; a later debounce deadline wins
+                retry_at = time.monotonic() + self.retry_delay
+                self._pending[key] = max(self._pending.get(key, retry_at), retry_at)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,3 +1,4 @@
 from .filter_manager import FilterManager
+from .predicates import compile_filters
 
-__all__ = ['FilterManager']
+__all__ = ['FilterManager', 'compile_filters']
@@ -0,0 +1,579 @@
+import operator
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.dbf_enc_reader.dates import record_date_key
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | '(?P<squote>(?:[^']|'')*)'
+      | "(?P<dquote>(?:[^"]|"")*)"
+      | (?P<op><=|>=|<>|!=|==|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_\-]*)
+    )""", re.VERBOSE)
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'LIKE', 'BETWEEN', 'TRUE', 'FALSE', 'DATE'}
+
+_COMPARISONS = {
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne, '<>': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+_FLIPPED = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}
+_AOF_OPERATORS = {'=': '=', '==': '==', '!=': '<>', '<>': '<>', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+
+class ExpressionError(ValueError):
+    """Raised when a filter expression cannot be parsed."""
+
+
+class NotTranslatableError(ValueError):
+    """Raised when an expression has no Advantage AOF equivalent."""
+
+
+def coerce(value: Any, kind: str) -> Any:
+    """
+    Convert a record value to the kind of the literal it is compared with.
+
+    Args:
+        value: Record value as returned by a reader
+        kind: Literal kind ('number', 'string', 'date' or 'bool')
+
+    Returns:
+        Comparable value, or None if the value is empty or cannot be converted
+    """
+    if value is None:
+        return None
+    if kind == 'string':
+        return str(value).strip()
+    if kind == 'number':
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            return value
+        try:
+            return Decimal(str(value).strip())
+        except InvalidOperation:
+            return None
+    if kind == 'date':
+        key = record_date_key(value)
+        if key is not None:
+            return key
+        text = str(value).strip()
+        return text if len(text) == 8 and text.isdigit() else None
+    if kind == 'bool':
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().upper()
+        return True if text in ('T', 'Y', 'TRUE') else False if text in ('F', 'N', 'FALSE') else None
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    """Match xBase EMPTY(): missing values, blank text, zero and .F. are all empty."""
+    if isinstance(value, str):
+        return value.strip() == ''
+    if isinstance(value, (int, float, Decimal)):
+        return value == 0
+    return value is None
+
+
+def _aof_string(text: str) -> str:
+    return f'"{text}"' if "'" in text else f"'{text}'"
+
+
+def _aof_exact(field_aof: str, literal: str) -> str:
+    """Exact string equality; xBase '=' is a prefix match ('FAB' = 'FA' is true)."""
+    return f"ALLTRIM({field_aof}) == {literal}"
+
+
+class Node(ABC):
+    def fields(self) -> List[str]:
+        return []
+
+    @abstractmethod
+    def row(self) -> Callable[[Dict[str, Any]], Any]:
+        """Compile the node into a function of one record."""
+
+    @abstractmethod
+    def column(self, columns: Dict[str, List[Any]], size: int) -> List[Any]:
+        """Evaluate the node over a batch of columns."""
+
+    def prefix_match(self) -> bool:
+        """Whether to_aof() may also match values that only start with a string literal."""
+        return False
+
+    @abstractmethod
+    def to_aof(self, exact: bool = False) -> str:
+        """
+        Translate the node to an Advantage AOF expression.
+
+        String equality is emitted as an index-optimizable FIELD = 'x', which
+        xBase evaluates as a prefix match; exact=True emits a slower exact
+        comparison instead (needed e.g. under NOT).
+        """
+
+
+class Field(Node):
+    def __init__(self, name: str):
+        self.name = name.upper()
+
+    def fields(self) -> List[str]:
+        return [self.name]
+
+    def row(self):
+        name = self.name
+        return lambda record: record.get(name)
+
+    def column(self, columns, size):
+        return columns.get(self.name, [None] * size)
+
+    def to_aof(self, exact=False) -> str:
+        return self.name
+
+
+class Literal(Node):
+    def __init__(self, value: Any, kind: str):
+        self.value = value
+        self.kind = kind
+
+    def row(self):
+        value = self.value
+        return lambda record: value
+
+    def column(self, columns, size):
+        return [self.value] * size
+
+    def to_aof(self, exact=False) -> str:
+        if self.kind == 'string':
+            return _aof_string(self.value)
+        if self.kind == 'date':
+            return f"STOD('{self.value}')"
+        if self.kind == 'bool':
+            return '.T.' if self.value else '.F.'
+        return str(self.value)
+
+
+class Compare(Node):
+    def __init__(self, left: Node, op: str, right: Node):
+        # Keep literals on the right so the field side is coerced to the literal kind
+        if isinstance(left, Literal) and not isinstance(right, Literal):
+            left, right, op = right, left, _FLIPPED.get(op, op)
+        self.left, self.op, self.right = left, op, right
+
+    def fields(self):
+        return self.left.fields() + self.right.fields()
+
+    def row(self):
+        compare = _COMPARISONS[self.op]
+        left = self.left.row()
+        if isinstance(self.right, Literal):
+            target, kind = self.right.value, self.right.kind
+
+            def check(record):
+                value = coerce(left(record), kind)
+                return value is not None and compare(value, target)
+            return check
+
+        right = self.right.row()
+
+        def check_fields(record):
+            a, b = left(record), right(record)
+            try:
+                return a is not None and b is not None and compare(a, b)
+            except TypeError:
+                return False
+        return check_fields
+
+    def column(self, columns, size):
+        compare = _COMPARISONS[self.op]
+        left = self.left.column(columns, size)
+        if isinstance(self.right, Literal):
+            target, kind = self.right.value, self.right.kind
+            return [v is not None and compare(v, target) for v in (coerce(value, kind) for value in left)]
+        check = self.row()
+        rows = [{name: columns.get(name, [None] * size)[i] for name in self.fields()} for i in range(size)]
+        return [check(record) for record in rows]
+
+    def _string_equality(self) -> bool:
+        return isinstance(self.right, Literal) and self.right.kind == 'string' and self.op in ('=', '==', '!=', '<>')
+
+    def prefix_match(self):
+        return self._string_equality() and self.op in ('=', '==')
+
+    def to_aof(self, exact=False):
+        if self._string_equality():
+            field, literal = self.left.to_aof(), self.right.to_aof()
+            if self.op in ('!=', '<>'):
+                # The complement of a prefix match would drop rows, so this stays exact
+                return f"NOT ({_aof_exact(field, literal)})"
+            return _aof_exact(field, literal) if exact else f"{field} = {literal}"
+        return f"{self.left.to_aof()} {_AOF_OPERATORS[self.op]} {self.right.to_aof()}"
+
+
+class InList(Node):
+    def __init__(self, operand: Node, values: List[Literal], negated: bool = False):
+        self.operand, self.values, self.negated = operand, values, negated
+        kinds = {value.kind for value in values}
+        if len(kinds) != 1:
+            raise ExpressionError("IN lists must hold values of a single type")
+        self.kind = kinds.pop()
+        self.targets = frozenset(value.value for value in values)
+
+    def fields(self):
+        return self.operand.fields()
+
+    def row(self):
+        operand, kind, targets, negated = self.operand.row(), self.kind, self.targets, self.negated
+
+        def check(record):
+            value = coerce(operand(record), kind)
+            return value is not None and ((value in targets) != negated)
+        return check
+
+    def column(self, columns, size):
+        kind, targets, negated = self.kind, self.targets, self.negated
+        return [v is not None and ((v in targets) != negated)
+                for v in (coerce(value, kind) for value in self.operand.column(columns, size))]
+
+    def prefix_match(self):
+        return self.kind == 'string' and not self.negated
+
+    def to_aof(self, exact=False):
+        field = self.operand.to_aof()
+        if self.kind == 'string' and (exact or self.negated):
+            joined = ' OR '.join(_aof_exact(field, value.to_aof()) for value in self.values)
+        else:
+            joined = ' OR '.join(f"{field} = {value.to_aof()}" for value in self.values)
+        return f"NOT ({joined})" if self.negated else f"({joined})"
+
+
+class Like(Node):
+    def __init__(self, operand: Node, pattern: str, negated: bool = False):
+        self.operand, self.pattern, self.negated = operand, pattern, negated
+        regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+        self.regex = re.compile(regex + r'\Z', re.DOTALL)
+
+    def fields(self):
+        return self.operand.fields()
+
+    def row(self):
+        operand, match, negated = self.operand.row(), self.regex.match, self.negated
+
+        def check(record):
+            value = operand(record)
+            return value is not None and ((match(str(value).strip()) is not None) != negated)
+        return check
+
+    def column(self, columns, size):
+        match, negated = self.regex.match, self.negated
+        return [value is not None and ((match(str(value).strip()) is not None) != negated)
+                for value in self.operand.column(columns, size)]
+
+    def to_aof(self, exact=False):
+        field = self.operand.to_aof()
+        body = self.pattern.strip('%')
+        if '_' in self.pattern or '%' in body:
+            raise NotTranslatableError(f"LIKE pattern '{self.pattern}' has no AOF equivalent")
+        starts, ends = self.pattern.startswith('%'), self.pattern.endswith('%')
+        if starts and ends:
+            aof = f"{_aof_string(body)} $ {field}"
+        elif ends:
+            aof = f"LEFT({field}, {len(body)}) = {_aof_string(body)}"
+        elif starts:
+            aof = f"RIGHT(TRIM({field}), {len(body)}) = {_aof_string(body)}"
+        else:
+            aof = f"TRIM({field}) == {_aof_string(body)}"
+        return f"NOT ({aof})" if self.negated else aof
+
+
+class IsNull(Node):
+    def __init__(self, operand: Node, negated: bool = False):
+        self.operand, self.negated = operand, negated
+
+    def fields(self):
+        return self.operand.fields()
+
+    def row(self):
+        operand, negated = self.operand.row(), self.negated
+        return lambda record: _is_empty(operand(record)) != negated
+
+    def column(self, columns, size):
+        negated = self.negated
+        return [_is_empty(value) != negated for value in self.operand.column(columns, size)]
+
+    def to_aof(self, exact=False):
+        aof = f"EMPTY({self.operand.to_aof()})"
+        return f"NOT {aof}" if self.negated else aof
+
+
+class Not(Node):
+    def __init__(self, operand: Node):
+        self.operand = operand
+
+    def fields(self):
+        return self.operand.fields()
+
+    def row(self):
+        operand = self.operand.row()
+        return lambda record: not operand(record)
+
+    def column(self, columns, size):
+        return [not value for value in self.operand.column(columns, size)]
+
+    def to_aof(self, exact=False):
+        return f"NOT ({self.operand.to_aof(exact=True)})"
+
+
+class BoolOp(Node):
+    def __init__(self, op: str, operands: List[Node]):
+        self.op, self.operands = op, operands
+
+    def fields(self):
+        names = []
+        for operand in self.operands:
+            names.extend(name for name in operand.fields() if name not in names)
+        return names
+
+    def row(self):
+        checks = [operand.row() for operand in self.operands]
+        if self.op == 'AND':
+            return lambda record: all(check(record) for check in checks)
+        return lambda record: any(check(record) for check in checks)
+
+    def column(self, columns, size):
+        result = self.operands[0].column(columns, size)
+        for operand in self.operands[1:]:
+            other = operand.column(columns, size)
+            if self.op == 'AND':
+                result = [a and b for a, b in zip(result, other)]
+            else:
+                result = [a or b for a, b in zip(result, other)]
+        return result
+
+    def prefix_match(self):
+        return any(operand.prefix_match() for operand in self.operands)
+
+    def to_aof(self, exact=False):
+        return f" {self.op} ".join(f"({operand.to_aof(exact)})" for operand in self.operands)
+
+
+class Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text: str) -> List[Tuple[str, Any]]:
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            if text[pos:].strip() == '':
+                break
+            match = _TOKEN_PATTERN.match(text, pos)
+            if not match or match.end() == pos:
+                raise ExpressionError(f"Unexpected character at {pos} in: {text}")
+            pos = match.end()
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind in ('squote', 'dquote'):
+                tokens.append(('string', value.replace("''", "'") if kind == 'squote' else value.replace('""', '"')))
+            elif kind == 'number':
+                tokens.append(('number', Decimal(value) if '.' in value else int(value)))
+            elif kind == 'ident' and value.upper() in KEYWORDS:
+                tokens.append(('keyword', value.upper()))
+            else:
+                tokens.append((kind, value))
+        tokens.append(('end', None))
+        return tokens
+
+    def _peek(self) -> Tuple[str, Any]:
+        return self.tokens[self.pos]
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _accept(self, kind: str, value: Any = None) -> bool:
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: Any = None) -> Tuple[str, Any]:
+        token = self._next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            expected = value or kind
+            raise ExpressionError(f"Expected {expected} but found {token[1] or token[0]} in: {self.text}")
+        return token
+
+    def parse(self) -> Node:
+        node = self._or()
+        self._expect('end')
+        return node
+
+    def _or(self) -> Node:
+        operands = [self._and()]
+        while self._accept('keyword', 'OR'):
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else BoolOp('OR', operands)
+
+    def _and(self) -> Node:
+        operands = [self._not()]
+        while self._accept('keyword', 'AND'):
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else BoolOp('AND', operands)
+
+    def _not(self) -> Node:
+        if self._accept('keyword', 'NOT'):
+            return Not(self._not())
+        return self._predicate()
+
+    def _predicate(self) -> Node:
+        if self._accept('punct', '('):
+            node = self._or()
+            self._expect('punct', ')')
+            return node
+
+        left = self._operand()
+        token = self._peek()
+        if token[0] == 'op':
+            self._next()
+            return Compare(left, token[1], self._operand())
+        if self._accept('keyword', 'IS'):
+            negated = self._accept('keyword', 'NOT')
+            self._expect('keyword', 'NULL')
+            return IsNull(left, negated)
+
+        negated = self._accept('keyword', 'NOT')
+        if self._accept('keyword', 'IN'):
+            self._expect('punct', '(')
+            values = [self._literal()]
+            while self._accept('punct', ','):
+                values.append(self._literal())
+            self._expect('punct', ')')
+            return InList(left, values, negated)
+        if self._accept('keyword', 'LIKE'):
+            pattern = self._expect('string')[1]
+            return Like(left, pattern, negated)
+        if self._accept('keyword', 'BETWEEN'):
+            low = self._operand()
+            self._expect('keyword', 'AND')
+            high = self._operand()
+            node = BoolOp('AND', [Compare(left, '>=', low), Compare(left, '<=', high)])
+            return Not(node) if negated else node
+        if negated:
+            raise ExpressionError(f"Expected IN, LIKE or BETWEEN after NOT in: {self.text}")
+
+        if isinstance(left, Field):
+            raise ExpressionError(f"Field {left.name} must be compared with something in: {self.text}")
+        return left
+
+    def _operand(self) -> Node:
+        token = self._peek()
+        if token[0] == 'ident':
+            self._next()
+            return Field(token[1])
+        return self._literal()
+
+    def _literal(self) -> Literal:
+        kind, value = self._next()
+        if kind == 'number':
+            return Literal(value, 'number')
+        if kind == 'string':
+            return Literal(value, 'string')
+        if kind == 'keyword' and value in ('TRUE', 'FALSE'):
+            return Literal(value == 'TRUE', 'bool')
+        if kind == 'keyword' and value == 'DATE':
+            self._expect('punct', '(')
+            text = self._expect('string')[1]
+            self._expect('punct', ')')
+            try:
+                return Literal(datetime.strptime(text, '%Y-%m-%d').strftime('%Y%m%d'), 'date')
+            except ValueError:
+                raise ExpressionError(f"Invalid date literal '{text}', expected YYYY-MM-DD")
+        raise ExpressionError(f"Expected a value but found {value or kind} in: {self.text}")
+
+
+class CompiledExpression:
+    def __init__(self, node: Node, source: str = ''):
+        """
+        A parsed filter expression, compiled once and evaluated many times.
+
+        Args:
+            node: Root node of the parsed expression
+            source: Original expression text
+        """
+        self.node = node
+        self.source = source
+        self.fields = node.fields()
+        # The AOF may let through extra rows, so they must be checked again in Python
+        self.prefix_match = node.prefix_match()
+        self._row = node.row()
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        """Evaluate the expression against one record."""
+        return bool(self._row(record))
+
+    def mask(self, columns: Dict[str, List[Any]], size: int) -> List[bool]:
+        """
+        Evaluate the expression over a column batch.
+
+        Args:
+            columns: Decoded values keyed by field name (at least self.fields)
+            size: Number of rows in the batch
+
+        Returns:
+            One boolean per row
+        """
+        return [bool(value) for value in self.node.column(columns, size)]
+
+    def to_aof(self, exact: bool = False) -> str:
+        """
+        Translate the expression to an Advantage optimized filter.
+
+        Args:
+            exact: Compare strings exactly instead of with the index-optimizable
+                prefix match (see prefix_match)
+
+        Raises:
+            NotTranslatableError: If part of the expression has no AOF equivalent
+        """
+        return self.node.to_aof(exact)
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+def compile_expression(text: str) -> CompiledExpression:
+    """
+    Parse a boolean filter expression.
+
+    Supports AND/OR/NOT, parentheses, comparisons (= == != <> < <= > >=),
+    IN lists, LIKE patterns, BETWEEN, IS [NOT] NULL (xBase EMPTY(): blank,
+    zero or false) and DATE('YYYY-MM-DD') literals, e.g. "TIPO_DOC IN ('FA', 'NC') AND TOTAL_BRUT > 0".
+
+    Args:
+        text: Expression source
+
+    Returns:
+        Compiled expression
+
+    Raises:
+        ExpressionError: If the expression is invalid
+    """
+    return CompiledExpression(Parser(text).parse(), text)
+
+
+def combine(expressions: List[CompiledExpression], op: str = 'AND') -> Optional[CompiledExpression]:
+    """Join compiled expressions with AND or OR."""
+    if not expressions:
+        return None
+    if len(expressions) == 1:
+        return expressions[0]
+    source = f" {op} ".join(f"({expression.source})" for expression in expressions)
+    return CompiledExpression(BoolOp(op, [expression.node for expression in expressions]), source)
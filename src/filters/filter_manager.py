@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from .expressions import CompiledExpression, compile_expression
+
 
 class FilterManager:
     def __init__(self, rules_file_path: str = None):
@@ -26,6 +28,7 @@ class FilterManager:
             self.rules_file_path = rules_file_path
             
         self.rules = self._load_rules()
+        self._compiled_expressions: Dict[str, CompiledExpression] = {}
     
     def _load_rules(self) -> Dict[str, Any]:
         """Load filter rules from JSON file"""
@@ -72,6 +75,9 @@ class FilterManager:
                 value_filter = self._build_value_filter(filter_config, value_filters)
                 if value_filter:
                     filters.extend(value_filter)
+                    
+            elif filter_type == 'expression':
+                filters.append(self._build_expression_filter(table_name, filter_config))
         
         return filters if filters else None
     
@@ -92,9 +98,9 @@ class FilterManager:
             print(f"[DEBUG] Date filter: {from_date} to {to_date}")
             
             if condition == "between":
-                return [{"field": date_field, "operator": "range", "from_value": from_date, "to_value": to_date}]
+                return [{"field": date_field, "operator": "range", "from_value": from_date, "to_value": to_date, "format": date_format}]
             elif condition == "equal":
-                return [{"field": date_field, "operator": "=", "value": from_date}]
+                return [{"field": date_field, "operator": "=", "value": from_date, "format": date_format}]
                 
         except ValueError as e:
             print(f"[DEBUG] Date conversion error: {e}")
@@ -123,6 +129,17 @@ class FilterManager:
             
         return None
     
+    def _build_expression_filter(self, table_name: str, filter_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an expression filter, parsing the rule only the first time it is used"""
+        source = filter_config["expression"]
+        cache_key = f"{table_name.replace('.DBF', '')}:{source}"
+        compiled = self._compiled_expressions.get(cache_key)
+        if compiled is None:
+            print(f"[DEBUG] Compiling expression filter: {source}")
+            compiled = compile_expression(source)
+            self._compiled_expressions[cache_key] = compiled
+        return {"field": None, "operator": "expression", "expression": compiled}
+    
     def _get_all_filters_for_table(self, table_name: str) -> Dict[str, Dict[str, Any]]:
         """Get all filter configurations for a specific table from rules"""
         print(f"[DEBUG] Looking up all filters for table: {table_name}")
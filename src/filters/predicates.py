@@ -0,0 +1,102 @@
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Any, Optional
+
+from src.dbf_enc_reader.dates import RECORD_DATE_FORMAT, parse_date
+from src.dbf_enc_reader.raw_reader import NUMERIC_FIELD_TYPES
+from .expressions import (CompiledExpression, Compare, Field, Like, Literal, BoolOp, ExpressionError,
+                          combine)
+
+
+def _parse_date(value: Any, date_format: Optional[str]) -> Optional[str]:
+    """Parse a filter date with its rules format (or the usual formats) into YYYYMMDD."""
+    parsed = parse_date(value, [date_format])
+    return parsed.strftime('%Y%m%d') if parsed else None
+
+
+def _literal(value: Any, field_type: Optional[str] = None, date_format: Optional[str] = None) -> Literal:
+    """
+    Turn a filter value into a literal of the kind the field holds.
+
+    Numeric fields (N/F/I/B/Y) compare as numbers and date fields (D) as
+    dates; any other field compares as text, including character fields
+    holding dates. Without a field type the kind is guessed from the value.
+    """
+    if field_type in NUMERIC_FIELD_TYPES:
+        try:
+            return Literal(Decimal(str(value).strip()), 'number')
+        except InvalidOperation:
+            raise ExpressionError(f"Filter value '{value}' is not a number")
+    if field_type == 'D':
+        parsed = _parse_date(value, date_format)
+        if parsed is None:
+            raise ExpressionError(f"Filter value '{value}' is not a date in format {date_format or RECORD_DATE_FORMAT}")
+        return Literal(parsed, 'date')
+    if field_type is not None:
+        return Literal(str(value), 'string')
+
+    if date_format:
+        parsed = _parse_date(value, date_format)
+        if parsed is not None:
+            return Literal(parsed, 'date')
+    if isinstance(value, bool):
+        return Literal(value, 'bool')
+    if isinstance(value, (int, float, Decimal)):
+        return Literal(Decimal(str(value)), 'number')
+    return Literal(str(value), 'string')
+
+
+def _filter_to_expression(filter_config: Dict[str, Any], field_types: Dict[str, str]) -> CompiledExpression:
+    """Convert a single filter dictionary into a compiled expression."""
+    if filter_config['operator'] == 'expression':
+        return filter_config['expression']
+
+    field = Field(filter_config['field'])
+    operator = filter_config['operator'].strip().upper()
+    field_type = field_types.get(field.name)
+    date_format = filter_config.get('format')
+
+    if operator == 'RANGE':
+        node = BoolOp('AND', [
+            Compare(field, '>=', _literal(filter_config['from_value'], field_type, date_format)),
+            Compare(field, '<=', _literal(filter_config['to_value'], field_type, date_format)),
+        ])
+        source = f"{field.name} BETWEEN '{filter_config['from_value']}' AND '{filter_config['to_value']}'"
+    elif operator == 'LIKE':
+        node = Like(field, str(filter_config['value']))
+        source = f"{field.name} LIKE '{filter_config['value']}'"
+    else:
+        if operator not in ('=', '==', '!=', '<>', '<', '<=', '>', '>='):
+            raise ExpressionError(f"Unsupported filter operator: {filter_config['operator']}")
+        node = Compare(field, operator, _literal(filter_config['value'], field_type, date_format))
+        source = f"{field.name} {operator} '{filter_config['value']}'"
+    return CompiledExpression(node, source)
+
+
+def compile_filters(filters: Optional[List[Dict[str, Any]]],
+                    field_types: Optional[Dict[str, str]] = None) -> Optional[CompiledExpression]:
+    """
+    Compile filter dictionaries into one expression for in-process evaluation.
+
+    Follows the same rules as the AOF expression: conditions are OR'ed when
+    they all target the same field and AND'ed otherwise.
+
+    Args:
+        filters: Filter dictionaries as built by FilterManager
+        field_types: Optional mapping of field name to DBF field type letter,
+            used to compare filter values as numbers, dates or text
+
+    Returns:
+        Compiled expression (callable on a record), or None if there is nothing to filter
+    """
+    if not filters:
+        return None
+    types = {name.upper(): field_type for name, field_type in (field_types or {}).items()}
+    expressions = [_filter_to_expression(f, types) for f in filters]
+    return combine(expressions, 'OR' if uses_or(filters) else 'AND')
+
+
+def uses_or(filters: List[Dict[str, Any]]) -> bool:
+    """Check whether a filter list is joined with OR (several conditions on one field)."""
+    return len(filters) > 1 and all(
+        f['operator'] != 'expression' and f['field'] == filters[0]['field'] for f in filters
+    )
@@ -1,13 +1,18 @@
 from src.dbf_enc_reader.core import DBFReader
 from pathlib import Path
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Callable
 from datetime import datetime
 from src.dbf_enc_reader.converters import DataConverter
+from src.dbf_enc_reader.checkpoint import JsonLinesSink
+from src.dbf_enc_reader.metadata_cache import TableMetadataCache
+from src.dbf_enc_reader.ordering import external_sort, make_sort_key, merge_sorted
+from src.dbf_enc_reader.watcher import TableWatcher
 from src.filters import FilterManager
 
 class Simple:
-    def __init__(self, data_source: str, encryption_password: str, mapping_file_path: str = None, dll_path: str = None, filters_file_path: str = None, encrypted: bool = False):
+    def __init__(self, data_source: str, encryption_password: str, mapping_file_path: str = None, dll_path: str = None, filters_file_path: str = None, encrypted: bool = False, backend: str = 'ads',
+                 metadata_cache_path: str = None, snapshot: bool = False, read_ahead: bool = False):
         """
         Initialize Simple DBF controller
         
@@ -18,6 +23,10 @@ class Simple:
             dll_path: Path to Advantage.Data.Provider.dll (optional)
             filters_file_path: Path to table_filters.json file (optional)
             encrypted: Whether the DBF files are encrypted (optional)
+            backend: 'ads' for the Advantage provider or 'raw' to parse unencrypted files directly (optional)
+            metadata_cache_path: Path to the persisted table metadata cache (optional)
+            snapshot: Read from local copies of the tables instead of the share (optional)
+            read_ahead: Use a read-ahead block cache when reading files directly (optional)
         """
         # Initialize DLL if path provided
         from src.dbf_enc_reader.connection import DBFConnection
@@ -27,6 +36,9 @@ class Simple:
         self.data_source = data_source
         self.encryption_password = encryption_password
         self.encrypted = encrypted
+        self.backend = backend
+        self.snapshot = snapshot
+        self.read_ahead = read_ahead
         self.mapping_file_path = mapping_file_path or "src/utils/mappings.json"
         # Handle exe-compatible default path
         if filters_file_path is None:
@@ -44,6 +56,8 @@ class Simple:
         self.filter_manager = FilterManager(self.filters_file_path)
         self.connection = DBFConnection(data_source, encryption_password, encrypted)
         self.converter = DataConverter()
+        self.metadata_cache = TableMetadataCache(metadata_cache_path)
+        self._snapshot_reader: Optional[DBFReader] = None
     
     def _load_mappings(self) -> Dict[str, Any]:
         """Load field mappings from JSON file"""
@@ -57,6 +71,39 @@ class Simple:
             print(f"Error parsing mapping file: {e}")
             return {}
     
+    def _create_reader(self) -> DBFReader:
+        """
+        Create a DBF reader for the configured data source and backend
+        
+        With snapshots enabled one reader is shared, so every call (and every
+        page of a paginated read) sees the same copy of a table until
+        refresh_snapshots() is called.
+        """
+        if self.snapshot:
+            if self._snapshot_reader is None:
+                self._snapshot_reader = DBFReader(self.data_source, self.encryption_password, self.encrypted,
+                                                  self.backend, metadata_cache=self.metadata_cache,
+                                                  snapshot=True, read_ahead=self.read_ahead)
+            return self._snapshot_reader
+        return DBFReader(self.data_source, self.encryption_password, self.encrypted, self.backend,
+                         metadata_cache=self.metadata_cache, read_ahead=self.read_ahead)
+    
+    def refresh_snapshots(self, table_name: Optional[str] = None) -> None:
+        """
+        Take new snapshots on the next read instead of reusing the current copies
+        
+        Args:
+            table_name: Table to refresh (all tables if omitted)
+        """
+        if self._snapshot_reader is not None:
+            self._snapshot_reader.refresh_snapshots(table_name)
+    
+    def close(self) -> None:
+        """Release the local snapshots held by this controller"""
+        if self._snapshot_reader is not None:
+            self._snapshot_reader.close()
+            self._snapshot_reader = None
+    
     def read_dbf_table(self, table_name: str, limit: Optional[int] = None, filters: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Simple method to read DBF table data
@@ -69,7 +116,7 @@ class Simple:
         Returns:
             List of records as dictionaries
         """
-        reader = DBFReader(self.data_source, self.encryption_password, self.encrypted)
+        reader = self._create_reader()
         return reader.read_table(table_name, limit, filters)
     
     def get_table_info(self, table_name: str) -> Dict[str, Any]:
@@ -82,7 +129,7 @@ class Simple:
         Returns:
             Dictionary containing table metadata
         """
-        reader = DBFReader(self.data_source, self.encryption_password, self.encrypted)
+        reader = self._create_reader()
         return reader.get_table_info(table_name)
     
     def get_table_data(self, table_name: str, limit: Optional[int] = None, date_range: Optional[Dict[str, str]] = None, value_filters: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
@@ -100,6 +147,262 @@ class Simple:
         """
         filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
         return self.read_dbf_table(table_name, limit, filters)
+
+    def get_table_page(self, table_name: str, page_size: int = 100, cursor: Optional[str] = None,
+                       date_range: Optional[Dict[str, str]] = None,
+                       value_filters: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Get one page of table data, continuing from the cursor of the previous page
+
+        Args:
+            table_name: Name of the table to read
+            page_size: Maximum number of records per page
+            cursor: Opaque cursor from the previous page (None for the first page)
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+
+        Returns:
+            Dictionary with 'records' and 'next_cursor' (None after the last page)
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        reader = self._create_reader()
+        records, next_cursor = reader.read_page(table_name, page_size, cursor, filters)
+        return {'records': records, 'next_cursor': next_cursor}
+
+    def aggregate_table_data(self, table_name: str, group_by: List[str], aggregates: Dict[str, Tuple[str, str]],
+                             date_range: Optional[Dict[str, str]] = None,
+                             value_filters: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get group-by aggregates over the filtered table in one streaming pass
+        
+        Args:
+            table_name: Name of the table to aggregate
+            group_by: Field names to group by, e.g. ["FAMILIA"]
+            aggregates: Mapping of output name to (function, field), e.g.
+                {"existencia": ("sum", "PROD_EXIST"), "productos": ("count", "*")}
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+            
+        Returns:
+            List of aggregated rows, one per group
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        reader = self._create_reader()
+        return reader.aggregate_table(table_name, group_by, aggregates, filters, self.get_field_types(table_name))
+    
+    def lookup_table_keys(self, table_name: str, field: str, keys: List[Any], tag: Optional[str] = None,
+                          date_range: Optional[Dict[str, str]] = None,
+                          value_filters: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Look up many key values at once through the field's index
+        
+        Args:
+            table_name: Name of the table to read
+            field: Key field name, e.g. NOTA_FOLIO
+            keys: Key values to look up
+            tag: Optional CDX tag name (defaults to the field name)
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+            
+        Returns:
+            List of matching records as dictionaries
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        reader = self._create_reader()
+        return reader.lookup_keys(table_name, field, keys, tag, filters)
+    
+    def extract_table_data(self, table_name: str, output_path: str, checkpoint_path: Optional[str] = None,
+                           date_range: Optional[Dict[str, str]] = None,
+                           value_filters: Optional[Dict[str, str]] = None,
+                           checkpoint_rows: int = 10000, checkpoint_seconds: float = 30.0) -> int:
+        """
+        Extract table data to a JSON lines file, resuming from the last checkpoint after a failure
+        
+        Args:
+            table_name: Name of the table to extract
+            output_path: Path to the .jsonl output file
+            checkpoint_path: Path to the checkpoint state file (defaults next to the output)
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+            checkpoint_rows: Save progress every this many rows
+            checkpoint_seconds: Save progress at least this often
+            
+        Returns:
+            Total number of rows extracted
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+        reader = self._create_reader()
+        with JsonLinesSink(output_path) as sink:
+            return reader.extract_resumable(table_name, sink, checkpoint_path, filters,
+                                            checkpoint_rows, checkpoint_seconds)
+    
+    def export_table_data(self, table_name: str, output_path: str, date_range: Optional[Dict[str, str]] = None,
+                          value_filters: Optional[Dict[str, str]] = None, batch_size: int = 1000,
+                          queue_size: int = 4) -> Dict[str, Any]:
+        """
+        Export table data to a JSON lines file with overlapped read, convert and serialize stages
+        
+        Args:
+            table_name: Name of the table to export
+            output_path: Path to the .jsonl output file
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+            batch_size: Number of rows per pipeline batch
+            queue_size: Maximum number of batches buffered between stages
+            
+        Returns:
+            Pipeline stats (rows, wall time, per-stage throughput and queue depth)
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        reader = self._create_reader()
+        with open(output_path, 'w', encoding='utf-8') as f:
+            def write_batch(records: List[Dict[str, Any]]) -> None:
+                f.write(''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records))
+            
+            return reader.extract_pipelined(table_name, write_batch, filters, batch_size=batch_size,
+                                            queue_size=queue_size)
+    
+    def get_consolidated_data(self, table_name: str, data_sources: List[str], order_by: List[str],
+                              dedup_by: Optional[List[str]] = None, date_range: Optional[Dict[str, str]] = None,
+                              value_filters: Optional[Dict[str, str]] = None, max_in_memory: int = 200000,
+                              source_field: Optional[str] = None, max_open_runs: int = 256) -> Iterator[Dict[str, Any]]:
+        """
+        Stream one table from many branch directories as a single ordered result
+        
+        Each branch is sorted with bounded memory (runs spilled to temp files)
+        and the branch streams are k-way merged, so memory and open files stay
+        fixed no matter how many rows are consolidated.
+        
+        Args:
+            table_name: Name of the table to consolidate
+            data_sources: Branch data directories
+            order_by: Fields to order by, e.g. ["F_EMISION", "NO_REFEREN"]
+            dedup_by: Optional fields identifying duplicate records across branches
+            date_range: Optional date range filter with 'from' and 'to' keys
+            value_filters: Optional value filters dict with field names as keys
+            max_in_memory: Total number of records held in memory across all branches
+            source_field: Optional field name added to each record with its data source
+            max_open_runs: Total number of run files open at once across all branches
+            
+        Yields:
+            Records in order_by order
+        """
+        filters = self.filter_manager.build_filters(table_name, date_range, value_filters)
+        sort_key = make_sort_key(order_by)
+        per_branch = max(1, max_in_memory // max(1, len(data_sources)))
+        fan_in = max(2, max_open_runs // max(1, len(data_sources)))
+        
+        def branch_records(data_source: str) -> Iterator[Dict[str, Any]]:
+            with DBFReader(data_source, self.encryption_password, self.encrypted, self.backend,
+                           snapshot=self.snapshot, read_ahead=self.read_ahead) as reader:
+                for record in reader.iter_table(table_name, filters=filters):
+                    if source_field:
+                        record[source_field] = data_source
+                    yield record
+        
+        streams = [external_sort(branch_records(source), sort_key, per_branch, max_fan_in=fan_in) for source in data_sources]
+        dedup_key = make_sort_key(dedup_by) if dedup_by else None
+        return merge_sorted(streams, sort_key, dedup_key)
+    
+    def get_table_tombstones(self, table_name: str, key_field: str, after_recno: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get the records flagged as deleted, as record number plus key field
+
+        Older records can be deleted at any time, so syncing deletes means
+        reading from record 1 (after_recno=0) on every run.
+
+        Args:
+            table_name: Name of the table
+            key_field: Field identifying the record downstream, e.g. NO_REFEREN
+            after_recno: Only report records after this record number, to page
+                through one read; not a marker for incremental syncs
+
+        Returns:
+            List of dictionaries with 'recno' and the key field value
+        """
+        reader = self._create_reader()
+        return list(reader.iter_tombstones(table_name, key_field, after_recno))
+
+    def get_distinct_keys(self, table_name: str, tag: str, lo: Any = None, hi: Any = None) -> List[Any]:
+        """
+        Get the distinct keys of an index tag in a range, reading only the .CDX file
+
+        Args:
+            table_name: Name of the table
+            tag: CDX tag name, e.g. NOTA_FOLIO
+            lo: Optional inclusive lower bound
+            hi: Optional inclusive upper bound
+
+        Returns:
+            List of distinct keys in index order
+        """
+        reader = self._create_reader()
+        return reader.distinct_keys(table_name, tag, lo, hi)
+
+    def get_latest_keys(self, table_name: str, tag: str, data_sources: List[str]) -> Dict[str, Any]:
+        """
+        Get the greatest key of an index tag in each branch, e.g. the latest folio
+
+        Args:
+            table_name: Name of the table
+            tag: CDX tag name
+            data_sources: Branch data directories
+
+        Returns:
+            Dictionary of data source to its greatest key (None for an empty index)
+        """
+        latest = {}
+        for data_source in data_sources:
+            with DBFReader(data_source, self.encryption_password, self.encrypted, self.backend,
+                           snapshot=self.snapshot, read_ahead=self.read_ahead) as reader:
+                latest[data_source] = reader.max_key(table_name, tag)
+        return latest
+
+    def watch_tables(self, on_change: Callable[[str, str], None], data_sources: Optional[List[str]] = None,
+                     tables: Optional[List[str]] = None, debounce: float = 2.0, max_workers: int = 2,
+                     poll_interval: float = 2.0) -> TableWatcher:
+        """
+        Start watching branch directories and call on_change for tables whose files changed
+        
+        Uses inotify on Linux and polls file sizes and mtimes elsewhere. Bursts
+        of writes are coalesced, so a table is re-extracted once per burst.
+        
+        Args:
+            on_change: Called as on_change(data_source, table_name), e.g. to run get_table_data
+            data_sources: Branch data directories (defaults to this instance's data source)
+            tables: Table names to watch (defaults to the tables in rules.json and mappings.json)
+            debounce: Quiet period in seconds before a changed table is handled
+            max_workers: Maximum number of tables re-extracted at the same time
+            poll_interval: Seconds between scans when polling
+            
+        Returns:
+            The running watcher; call stop() on it to stop watching
+        """
+        if tables is None:
+            tables = list(self.filter_manager.rules or {}) + list(self.mappings)
+        watcher = TableWatcher(data_sources or [self.data_source], tables, on_change,
+                               debounce, max_workers, poll_interval)
+        watcher.start()
+        return watcher
+    
+    def get_field_types(self, table_name: str) -> Dict[str, str]:
+        """
+        Get the mappings.json type of each mapped DBF field
+        
+        Args:
+            table_name: Name of the table (with or without .DBF extension)
+            
+        Returns:
+            Dictionary of DBF field name to type
+        """
+        table_key = table_name if table_name.upper().endswith('.DBF') else f"{table_name}.DBF"
+        table_config = self.mappings.get(table_key, {})
+        return {
+            field_config['dbf']: field_config.get('type', 'string')
+            for field_config in table_config.get('fields', {}).values()
+            if 'dbf' in field_config
+        }
     
     # Filter-related methods now delegated to FilterManager
     def get_filter_config(self, table_name: str, filter_type: str = "date") -> Dict[str, Any]:
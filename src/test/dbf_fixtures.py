@@ -0,0 +1,135 @@
+import struct
+from datetime import date
+from typing import Any, Iterable, List, Sequence, Tuple
+
+# (name, type, length, decimals)
+FieldSpec = Tuple[str, str, int, int]
+
+
+def _encode_value(field: FieldSpec, value: Any, codepage: str) -> bytes:
+    _, field_type, length, decimals = field
+    if field_type == 'C':
+        return (value or '').encode(codepage).ljust(length)
+    if field_type == 'N':
+        text = '' if value is None else (f"{value:.{decimals}f}" if decimals else str(value))
+        return text.encode('ascii').rjust(length)
+    if field_type == 'D':
+        return value.strftime('%Y%m%d').encode('ascii') if isinstance(value, date) else b' ' * 8
+    if field_type == 'L':
+        return b'?' if value is None else b'T' if value else b'F'
+    if field_type == 'I':
+        return struct.pack('<i', value or 0)
+    raise ValueError(f"Unsupported fixture field type {field_type}")
+
+
+def write_dbf(path: str, fields: Sequence[FieldSpec], rows: Iterable[Sequence[Any]],
+              language_driver: int = 0x02, deleted: Iterable[int] = (), codepage: str = 'cp850') -> None:
+    """
+    Write a small dBase III / FoxPro table for raw backend tests.
+
+    Args:
+        path: Output .DBF path
+        fields: Field specs as (name, type, length, decimals)
+        rows: Row values in field order
+        language_driver: Language driver byte stored at header offset 29
+        deleted: Zero based indexes of rows flagged as deleted
+        codepage: Codec used to encode character values
+    """
+    rows = list(rows)
+    deleted = set(deleted)
+    record_length = 1 + sum(field[2] for field in fields)
+    header_length = 32 + 32 * len(fields) + 1
+    header = struct.pack('<B3BIHH', 0x03, 125, 1, 1, len(rows), header_length, record_length)
+    header += b'\x00' * 17 + bytes([language_driver]) + b'\x00\x00'
+    for name, field_type, length, decimals in fields:
+        header += name.encode('ascii').ljust(11, b'\x00') + field_type.encode('ascii')
+        header += b'\x00' * 4 + bytes([length, decimals]) + b'\x00' * 14
+    data = bytearray(header + b'\r')
+    for i, row in enumerate(rows):
+        data += b'*' if i in deleted else b' '
+        for field, value in zip(fields, row):
+            data += _encode_value(field, value, codepage)
+    data += b'\x1a'
+    with open(path, 'wb') as f:
+        f.write(bytes(data))
+
+
+def _leaf_node(entries: List[Tuple[bytes, int]], key_length: int, pad: bytes, left: int, right: int,
+               root: bool) -> bytes:
+    """Build a compact leaf node with 16 bit record numbers and 8 bit dup/trail counts."""
+    recno_bits, dup_bits, trail_bits, entry_bytes = 16, 8, 8, 4
+    node = bytearray(512)
+    struct.pack_into('<HHii', node, 0, 2 | (1 if root else 0), len(entries), left, right)
+    struct.pack_into('<HIBBBBBBB', node, 12, 0, 0xFFFF, 0xFF, 0xFF, recno_bits, dup_bits, trail_bits,
+                     entry_bytes, 0)
+    key_pos = 512
+    previous = b''
+    for i, (key, recno) in enumerate(entries):
+        key = key.ljust(key_length, pad)
+        dup = 0
+        while dup < len(previous) and previous[dup] == key[dup]:
+            dup += 1
+        trail = min(len(key) - len(key.rstrip(pad)), key_length - dup)
+        new_bytes = key[dup:key_length - trail]
+        key_pos -= len(new_bytes)
+        node[key_pos:key_pos + len(new_bytes)] = new_bytes
+        info = recno | dup << recno_bits | trail << (recno_bits + dup_bits)
+        node[24 + i * entry_bytes:24 + (i + 1) * entry_bytes] = info.to_bytes(entry_bytes, 'little')
+        previous = key
+    assert key_pos >= 24 + len(entries) * entry_bytes, "too many keys for one fixture leaf"
+    return bytes(node)
+
+
+def _tag_header(root: int, key_length: int, expression: str, options: int = 0x60) -> bytes:
+    header = bytearray(1024)
+    struct.pack_into('<iiiHBB', header, 0, root, -1, 0, key_length, options, 1)
+    raw_expression = expression.encode('ascii') + b'\x00'
+    struct.pack_into('<H', header, 510, len(raw_expression))
+    header[512:512 + len(raw_expression)] = raw_expression
+    return bytes(header)
+
+
+def _tag_tree(base: int, entries: List[Tuple[bytes, int]], key_length: int, pad: bytes,
+              per_leaf: int) -> Tuple[int, bytes]:
+    leaves = [entries[i:i + per_leaf] for i in range(0, len(entries), per_leaf)] or [[]]
+    offsets = [base + i * 512 for i in range(len(leaves))]
+    multi = len(leaves) > 1
+    data = b''
+    for i, leaf in enumerate(leaves):
+        data += _leaf_node(leaf, key_length, pad, offsets[i - 1] if i else -1,
+                           offsets[i + 1] if i + 1 < len(leaves) else -1, root=not multi)
+    if not multi:
+        return offsets[0], data
+    # Interior root: each entry holds the greatest key of its child
+    node = bytearray(512)
+    struct.pack_into('<HHii', node, 0, 1, len(leaves), -1, -1)
+    entry_size = key_length + 8
+    for i, leaf in enumerate(leaves):
+        key, recno = leaf[-1]
+        node[12 + i * entry_size:12 + (i + 1) * entry_size] = \
+            key.ljust(key_length, pad) + struct.pack('>II', recno, offsets[i])
+    return base + len(leaves) * 512, data + bytes(node)
+
+
+def write_cdx(path: str, tags: Sequence[Tuple[str, str, int, bytes, List[Tuple[bytes, int]]]],
+              per_leaf: int = 40) -> None:
+    """
+    Write a FoxPro compound index for CDX reader tests.
+
+    Args:
+        path: Output .CDX path
+        tags: (name, expression, key length, pad byte, sorted (key bytes, recno) entries) per tag
+        per_leaf: Keys per leaf node; more keys than this build a two level tree
+    """
+    body = b''
+    offset = 1024 + 512  # tag directory header and its single leaf
+    directory = []
+    for name, expression, key_length, pad, entries in tags:
+        header_offset = offset + len(body)
+        root, tree = _tag_tree(header_offset + 1024, list(entries), key_length, pad, per_leaf)
+        body += _tag_header(root, key_length, expression) + tree
+        directory.append((name.encode('ascii'), header_offset))
+    directory.sort()
+    data = _tag_header(1024, 10, '', 0xE0) + _leaf_node(directory, 10, b'\x00', -1, -1, root=True) + body
+    with open(path, 'wb') as f:
+        f.write(data)
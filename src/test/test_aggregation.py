@@ -0,0 +1,57 @@
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.aggregation import HashAggregator
+from src.test.dbf_fixtures import write_dbf
+
+
+def test_min_max_dates_are_chronological():
+    aggregator = HashAggregator([], {'first': ('min', 'F_EMISION'), 'last': ('max', 'F_EMISION')})
+    for day in ('15/01/2024', '01/03/2024', '05/01/2024'):
+        aggregator.add({'F_EMISION': day})
+
+    assert aggregator.results() == [{'first': '05/01/2024', 'last': '01/03/2024'}]
+
+
+def test_field_names_match_records_ignoring_case():
+    aggregator = HashAggregator(['tipo_doc'], {'total': ('sum', 'total_brut'), 'rows': ('count', '*')},
+                                {'TOTAL_BRUT': 'number'})
+    for tipo, total in (('FA', 10), ('NC', 2.5), ('FA', 5)):
+        aggregator.add({'TIPO_DOC': tipo, 'TOTAL_BRUT': total})
+
+    assert sorted(aggregator.results(), key=lambda row: row['tipo_doc']) == [
+        {'tipo_doc': 'FA', 'total': 15, 'rows': 2},
+        {'tipo_doc': 'NC', 'total': 2.5, 'rows': 1},
+    ]
+
+
+def test_sums_and_averages_stay_exact():
+    aggregator = HashAggregator([], {'total': ('sum', 'TOTAL_BRUT'), 'average': ('avg', 'TOTAL_BRUT')},
+                                {'TOTAL_BRUT': 'number'})
+    for total in (Decimal('0.10'), Decimal('0.20'), Decimal('0.30')):
+        aggregator.add({'TOTAL_BRUT': total})
+
+    [row] = aggregator.results()
+    assert row == {'total': Decimal('0.60'), 'average': Decimal('0.2')}
+    assert all(isinstance(value, Decimal) for value in row.values())
+
+
+def test_aggregate_table_over_a_filtered_raw_scan(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    fields = [('TIPO_DOC', 'C', 3, 0), ('F_EMISION', 'D', 8, 0), ('TOTAL_BRUT', 'N', 10, 2)]
+    rows = [('FA', date(2025, 9, 24), Decimal('12.50')), ('NC', date(2025, 9, 25), Decimal('3.10')),
+            ('FA', date(2025, 1, 2), Decimal('7.25')), ('FA', date(2025, 9, 30), Decimal('100.00'))]
+    write_dbf(str(tmp_path / 'venta.dbf'), fields, rows, deleted=[3])
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+
+    results = reader.aggregate_table('VENTA', ['tipo_doc'],
+                                     {'total': ('sum', 'total_brut'), 'last': ('max', 'f_emision')},
+                                     [{'field': 'TOTAL_BRUT', 'operator': '>', 'value': '5'}],
+                                     {'TOTAL_BRUT': 'number'})
+
+    assert results == [{'tipo_doc': 'FA', 'total': Decimal('19.75'), 'last': '24/09/2025'}]
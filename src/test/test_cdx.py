@@ -0,0 +1,115 @@
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.cdx import (CDXIndex, KEY_CHARACTER, KEY_DATE, KEY_INTEGER, KEY_NUMERIC, decode_key,
+                                    encode_key, key_pad, key_type_for)
+from src.dbf_enc_reader.raw_reader import FieldDescriptor
+from src.test.dbf_fixtures import write_cdx, write_dbf
+
+FIELDS = [FieldDescriptor('FOLIO', 'C', 6, 0, 1), FieldDescriptor('TOTAL', 'N', 10, 2, 7),
+          FieldDescriptor('NO_REFEREN', 'N', 8, 0, 17), FieldDescriptor('F_EMISION', 'D', 8, 0, 25),
+          FieldDescriptor('CANTIDAD', 'I', 4, 0, 33)]
+
+
+def test_key_type_follows_the_indexed_field():
+    assert key_type_for('total', FIELDS) == (KEY_NUMERIC, FIELDS[1])
+    assert key_type_for('F_EMISION', FIELDS) == (KEY_DATE, FIELDS[3])
+    assert key_type_for('CANTIDAD', FIELDS) == (KEY_INTEGER, FIELDS[4])
+    assert key_type_for('DTOS(F_EMISION)', FIELDS) == (KEY_CHARACTER, None)
+
+
+@pytest.mark.parametrize('value, key_type, field, expected', [
+    ('00123', KEY_CHARACTER, FIELDS[0], '00123'),
+    (Decimal('-12.50'), KEY_NUMERIC, FIELDS[1], Decimal('-12.50')),
+    (Decimal('3.10'), KEY_NUMERIC, FIELDS[1], Decimal('3.10')),
+    (42, KEY_NUMERIC, FIELDS[2], 42),
+    (date(2025, 9, 24), KEY_DATE, FIELDS[3], '24/09/2025'),
+    ('24/09/2025', KEY_DATE, FIELDS[3], '24/09/2025'),
+    (-7, KEY_INTEGER, FIELDS[4], -7),
+])
+def test_keys_round_trip(value, key_type, field, expected):
+    raw = encode_key(value, key_type, 8, 'cp850')
+
+    assert len(raw) == 8
+    assert decode_key(raw, key_type, 'cp850', field) == expected
+
+
+def test_encoded_keys_sort_like_their_values():
+    numbers = [-1000.5, -3, -0.25, 0, 0.25, 7, 1e9]
+    assert sorted(numbers, key=lambda n: encode_key(n, KEY_NUMERIC, 8, 'cp850')) == numbers
+    integers = [-2 ** 31, -1, 0, 1, 2 ** 31 - 1]
+    assert sorted(integers, key=lambda n: encode_key(n, KEY_INTEGER, 4, 'cp850')) == integers
+    dates = [date(1999, 12, 31), date(2024, 1, 3), date(2025, 9, 24)]
+    assert sorted(dates, key=lambda d: encode_key(d, KEY_DATE, 8, 'cp850')) == dates
+
+
+@pytest.fixture
+def venta_cdx(tmp_path):
+    folios = [(f"{i:05d}".encode('ascii'), i) for i in range(1, 101)]
+    amounts = sorted((encode_key(i * 1.5, KEY_NUMERIC, 8, 'cp850'), i) for i in range(1, 101))
+    path = str(tmp_path / 'venta.cdx')
+    write_cdx(path, [('FOLIO', 'FOLIO', 6, key_pad(KEY_CHARACTER), folios),
+                     ('TOTAL', 'TOTAL', 8, key_pad(KEY_NUMERIC), amounts)], per_leaf=30)
+    return path
+
+
+def test_reads_the_tag_directory(venta_cdx):
+    with CDXIndex(venta_cdx) as index:
+        assert index.tag_names() == ['FOLIO', 'TOTAL']
+        assert index.tags['TOTAL'].expression == 'TOTAL'
+        assert not index.tags['FOLIO'].descending
+
+
+def test_range_walk_crosses_leaves(venta_cdx):
+    with CDXIndex(venta_cdx) as index:
+        tag = index.tags['FOLIO']
+        lo, hi = encode_key('00025', KEY_CHARACTER, 6, 'cp850'), encode_key('00065', KEY_CHARACTER, 6, 'cp850')
+        recnos = [recno for _, recno in index.iter_range(tag, lo, hi)]
+        assert recnos == list(range(25, 66))
+        assert len(list(index.iter_range(tag))) == 100
+
+        tag = index.tags['TOTAL']
+        lo = encode_key(140, KEY_NUMERIC, 8, 'cp850')
+        keys = [decode_key(key, KEY_NUMERIC, 'cp850', FIELDS[1]) for key, _ in index.iter_range(tag, lo, None, b'\x00')]
+        assert keys == [Decimal(f"{i * 1.5:.2f}") for i in range(94, 101)]
+
+
+def test_last_entry_honors_the_upper_bound(venta_cdx):
+    with CDXIndex(venta_cdx) as index:
+        tag = index.tags['FOLIO']
+        assert index.last_entry(tag) == (b'00100 ', 100)
+        assert index.last_entry(tag, encode_key('00061', KEY_CHARACTER, 6, 'cp850')) == (b'00061 ', 61)
+        assert index.last_entry(tag, encode_key('00000', KEY_CHARACTER, 6, 'cp850')) is None
+
+        tag = index.tags['TOTAL']
+        key, recno = index.last_entry(tag, encode_key(100, KEY_NUMERIC, 8, 'cp850'), b'\x00')
+        assert (decode_key(key, KEY_NUMERIC, 'cp850', FIELDS[1]), recno) == (Decimal('99.00'), 66)
+
+
+def test_date_bounds_on_dtos_tags_are_encoded_as_yyyymmdd(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    days = [date(2024, 12, 30), date(2025, 1, 2), date(2025, 1, 15), date(2025, 2, 1)]
+    write_dbf(str(tmp_path / 'venta.dbf'), [('F_EMISION', 'D', 8, 0), ('FOLIO', 'C', 5, 0)],
+              [(day, f'{n:05d}') for n, day in enumerate(days, start=1)])
+    keys = [(day.strftime('%Y%m%d').encode('ascii'), n) for n, day in enumerate(days, start=1)]
+    write_cdx(str(tmp_path / 'venta.cdx'), [
+        ('EMISION', 'DTOS(F_EMISION)', 8, key_pad(KEY_CHARACTER), keys),
+        ('EMI_FOLIO', 'DTOS(F_EMISION)+FOLIO', 13, key_pad(KEY_CHARACTER),
+         [(key + f'{n:05d}'.encode('ascii'), n) for key, n in keys]),
+        ('FOLIO', 'FOLIO', 5, key_pad(KEY_CHARACTER), [(f'{n:05d}'.encode('ascii'), n) for n in range(1, 5)]),
+    ])
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+
+    for lo, hi in ((date(2025, 1, 1), date(2025, 1, 31)), ('01/01/2025', '31/01/2025'), ('20250101', '20250131')):
+        assert [recno for _, recno, _ in reader.scan_index_keys('VENTA', 'EMISION', lo, hi)] == [2, 3]
+    assert [key for key, _, _ in reader.scan_index_keys('VENTA', 'EMI_FOLIO', date(2025, 1, 2), '20250115~')] == \
+        ['2025010200002', '2025011500003']
+    assert reader.max_key('VENTA', 'EMISION', hi=date(2025, 1, 31)) == '20250115'
+
+    with pytest.raises(ValueError):
+        list(reader.scan_index_keys('VENTA', 'FOLIO', 2, 3))
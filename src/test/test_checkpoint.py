@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.checkpoint import ExtractionCheckpoint, JsonLinesSink
+from src.test.dbf_fixtures import write_dbf
+
+
+def _recnos(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['_recno'] for line in f]
+
+
+def test_fresh_extraction_overwrites_previous_output(tmp_path):
+    output = tmp_path / 'venta.jsonl'
+    with JsonLinesSink(str(output)) as sink:
+        sink.start(0)
+        assert sink.write(3, {'NAME': 'cc'})
+
+    # Another extraction without a checkpoint must not be deduped against the old rows
+    with JsonLinesSink(str(output)) as sink:
+        sink.start(0)
+        assert [sink.write(recno, {'NAME': name}) for recno, name in ((1, 'aa'), (2, 'bb'), (3, 'cc'))] == [True] * 3
+
+    assert _recnos(output) == [1, 2, 3]
+
+
+def test_resume_drops_only_rows_already_in_the_file(tmp_path):
+    output = tmp_path / 'venta.jsonl'
+    with open(output, 'w', encoding='utf-8') as f:
+        for recno in (1, 2, 3, 4):
+            f.write(json.dumps({'_recno': recno}) + '\n')
+        f.write('{"_recno": 5, "NAME"')  # torn by a crash
+
+    with JsonLinesSink(str(output)) as sink:
+        # Checkpoint was taken at record 2, records 3 and 4 are read again
+        sink.start(2)
+        assert [sink.write(recno, {}) for recno in (3, 4, 5, 6)] == [False, False, True, True]
+
+    assert _recnos(output) == [1, 2, 3, 4, 5, 6]
+
+
+def test_checkpoint_for_another_filter_starts_over(tmp_path):
+    state = tmp_path / 'venta.checkpoint.json'
+    checkpoint = ExtractionCheckpoint(str(state), 'VENTA', "NAME = 'cc'")
+    checkpoint.advance(3)
+    checkpoint.save()
+
+    assert ExtractionCheckpoint(str(state), 'VENTA', "NAME = 'aa'").load() == 0
+    assert ExtractionCheckpoint(str(state), 'VENTA', "NAME = 'cc'").load() == 3
+
+
+class FailingSink(JsonLinesSink):
+    def __init__(self, output_path, fail_at):
+        super().__init__(output_path)
+        self.fail_at = fail_at
+        self.writes = 0
+
+    def write(self, recno, record):
+        self.writes += 1
+        if self.writes == self.fail_at:
+            raise IOError("share went away")
+        return super().write(recno, record)
+
+
+def test_resumed_extraction_counts_rows_written_after_the_checkpoint(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    rows = [(recno,) for recno in range(1, 22)]
+    write_dbf(str(tmp_path / 'venta.dbf'), [('NO_REFEREN', 'N', 8, 0)], rows, deleted=[6, 15])
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+    output, state = str(tmp_path / 'venta.jsonl'), str(tmp_path / 'venta.checkpoint.json')
+
+    with FailingSink(output, fail_at=13) as sink:
+        with pytest.raises(IOError):
+            reader.extract_resumable('VENTA', sink, state, checkpoint_rows=5)
+    # Rows 11 to 13 were written after the checkpoint at the 10th row and are read again
+    assert len(_recnos(output)) == 12
+
+    with JsonLinesSink(output) as sink:
+        total = reader.extract_resumable('VENTA', sink, state, checkpoint_rows=5)
+
+    assert total == len(_recnos(output)) == 19
+    assert not os.path.exists(state)
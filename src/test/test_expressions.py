@@ -0,0 +1,146 @@
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.raw_reader import RawDBFReader
+from src.filters.expressions import ExpressionError, NotTranslatableError, combine, compile_expression
+from src.filters.predicates import compile_filters
+from src.test.dbf_fixtures import write_dbf
+
+RECORDS = [
+    {'TIPO_DOC': 'FA', 'TOTAL_BRUT': Decimal('12.50'), 'F_EMISION': '24/09/2025', 'CLIENTE': 'CLI1'},
+    {'TIPO_DOC': 'FAB', 'TOTAL_BRUT': Decimal('150.00'), 'F_EMISION': '03/01/2024', 'CLIENTE': None},
+    {'TIPO_DOC': 'NC', 'TOTAL_BRUT': Decimal('-3.10'), 'F_EMISION': None, 'CLIENTE': 'CLI2'},
+]
+
+
+def _columns(records):
+    return {name: [record[name] for record in records] for name in records[0]}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("TIPO_DOC = 'FA'", [True, False, False]),
+    ("TIPO_DOC IN ('FA', 'NC')", [True, False, True]),
+    ("TOTAL_BRUT BETWEEN 9 AND 100", [True, False, False]),
+    ("TOTAL_BRUT > 12.5 OR CLIENTE IS NULL", [False, True, False]),
+    ("F_EMISION >= DATE('2025-01-01')", [True, False, False]),
+    ("NOT TIPO_DOC LIKE 'FA%'", [False, False, True]),
+])
+def test_row_and_mask_agree(text, expected):
+    expression = compile_expression(text)
+
+    assert [expression(record) for record in RECORDS] == expected
+    assert expression.mask(_columns(RECORDS), len(RECORDS)) == expected
+
+
+def test_invalid_expression_is_rejected():
+    with pytest.raises(ExpressionError):
+        compile_expression("TIPO_DOC = ")
+    with pytest.raises(ExpressionError):
+        compile_expression("TIPO_DOC IN ('FA', 1)")
+
+
+def test_string_equality_translates_to_an_optimizable_prefix_match():
+    equal = compile_expression("TIPO_DOC = 'FA'")
+    assert equal.to_aof() == "TIPO_DOC = 'FA'"
+    assert equal.prefix_match
+    assert equal.to_aof(exact=True) == "ALLTRIM(TIPO_DOC) == 'FA'"
+    assert compile_expression("TIPO_DOC IN ('FA', 'NC')").to_aof() == "(TIPO_DOC = 'FA' OR TIPO_DOC = 'NC')"
+
+    # Negations of a prefix match would drop rows, so they stay exact
+    for text, aof in (("TIPO_DOC <> 'FA'", "NOT (ALLTRIM(TIPO_DOC) == 'FA')"),
+                      ("TIPO_DOC NOT IN ('FA')", "NOT (ALLTRIM(TIPO_DOC) == 'FA')"),
+                      ("NOT (TIPO_DOC = 'FA' AND TOTAL_BRUT > 0)",
+                       "NOT ((ALLTRIM(TIPO_DOC) == 'FA') AND (TOTAL_BRUT > 0))")):
+        expression = compile_expression(text)
+        assert (expression.to_aof(), expression.prefix_match) == (aof, False)
+    assert not compile_expression("TOTAL_BRUT >= 12.50").prefix_match
+
+
+def test_prefix_matches_are_rechecked_in_python():
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    reader = DBFReader('.', encrypted=False, backend='raw')
+    filters = [{'operator': 'expression', 'expression': compile_expression("TIPO_DOC = 'FA'")},
+               {'operator': 'expression', 'expression': compile_expression("TOTAL_BRUT > 0")}]
+
+    aof, residual = reader._plan_filters(filters)
+    assert aof == "(TIPO_DOC = 'FA') AND (TOTAL_BRUT > 0)"
+    # 'FAB' passes the AOF prefix match but not the residual
+    assert [residual(record) for record in RECORDS] == [True, False, False]
+
+
+def test_is_null_means_xbase_empty_on_both_backends(tmp_path):
+    path = str(tmp_path / 'cliente.dbf')
+    write_dbf(path, [('NOMBRE', 'C', 6, 0), ('SALDO', 'N', 8, 2), ('ACTIVO', 'L', 1, 0)],
+              [('CLI1', Decimal('0.00'), True), ('', Decimal('5.00'), False), ('CLI2', Decimal('1.50'), True)])
+
+    for field, recnos in (('NOMBRE', [2]), ('SALDO', [1]), ('ACTIVO', [2])):
+        expression = compile_expression(f"{field} IS NULL")
+        # Advantage evaluates the AOF with EMPTY(), true for blanks, zero and .F.
+        assert expression.to_aof() == f"EMPTY({field})"
+        with RawDBFReader(path) as raw:
+            assert [recno for recno, _ in raw.iter_records(where=expression)] == recnos
+            negated = compile_expression(f"{field} IS NOT NULL")
+            assert [recno for recno, _ in raw.iter_records(where=negated)] == [n for n in (1, 2, 3) if n not in recnos]
+
+
+def test_untranslatable_part_is_left_as_residual():
+    indexed = compile_expression("TIPO_DOC = 'FA'")
+    residual = compile_expression("CLIENTE LIKE 'C_I1'")
+    with pytest.raises(NotTranslatableError):
+        residual.to_aof()
+
+    joined = combine([indexed, residual])
+    assert joined.fields == ['TIPO_DOC', 'CLIENTE']
+    assert [joined(record) for record in RECORDS] == [True, False, False]
+    with pytest.raises(NotTranslatableError):
+        joined.to_aof()
+
+
+FIELDS = [('AMT', 'N', 8, 2), ('QTY', 'N', 5, 0), ('F_EMISION', 'D', 8, 0), ('NOTA_FECHA', 'C', 10, 0)]
+ROWS = [
+    (Decimal('12.50'), 9, date(2025, 9, 24), '09-24-2025'),
+    (Decimal('99.99'), 100, date(2024, 1, 3), '01-03-2024'),
+    (Decimal('100.01'), 101, date(2023, 12, 31), '12-31-2023'),
+]
+
+
+@pytest.fixture
+def nota(tmp_path):
+    path = str(tmp_path / 'nota.dbf')
+    write_dbf(path, FIELDS, ROWS)
+    return path
+
+
+def _matches(path, filters):
+    with RawDBFReader(path) as raw:
+        where = compile_filters(filters, {field.name: field.type for field in raw.fields})
+        return [recno for recno, _ in raw.iter_records(where=where)]
+
+
+def test_string_values_on_numeric_fields_compare_as_numbers(nota):
+    assert _matches(nota, [{'field': 'AMT', 'operator': '=', 'value': '12.50'}]) == [1]
+    assert _matches(nota, [{'field': 'QTY', 'operator': 'range', 'from_value': '9', 'to_value': '100'}]) == [1, 2]
+    assert _matches(nota, [{'field': 'AMT', 'operator': '>', 'value': '99.99'}]) == [3]
+
+
+def test_date_fields_compare_chronologically(nota):
+    filters = [{'field': 'F_EMISION', 'operator': 'range', 'from_value': '01/01/2024',
+                'to_value': '31/12/2025', 'format': '%d/%m/%Y'}]
+    assert _matches(nota, filters) == [1, 2]
+
+
+def test_character_date_fields_compare_as_text(nota):
+    filters = [{'field': 'NOTA_FECHA', 'operator': '=', 'value': '09-24-2025', 'format': '%m-%d-%Y'}]
+    assert _matches(nota, filters) == [1]
+    filters = [{'field': 'NOTA_FECHA', 'operator': '<', 'value': '10-01-2020', 'format': '%m-%d-%Y'}]
+    assert _matches(nota, filters) == [1, 2]
+
+
+def test_non_numeric_value_on_numeric_field_is_rejected():
+    with pytest.raises(ExpressionError):
+        compile_filters([{'field': 'AMT', 'operator': '=', 'value': 'abc'}], {'AMT': 'N'})
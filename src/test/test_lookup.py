@@ -0,0 +1,62 @@
+import sys
+import os
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.cdx import KEY_NUMERIC, encode_key, key_pad
+from src.dbf_enc_reader.raw_reader import RawDBFReader
+from src.test.dbf_fixtures import write_cdx, write_dbf
+
+DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+
+FIELDS = [('NO_REFEREN', 'N', 8, 0), ('FOLIO', 'C', 6, 0), ('TIPO_DOC', 'C', 3, 0)]
+ROWS = [(3, '00123', 'FA'), (1, '123', 'NC'), (2, '00124', 'FA'), (2, '00125', 'NC'), (4, '00126', 'FA')]
+
+
+@pytest.fixture
+def venta(tmp_path):
+    write_dbf(str(tmp_path / 'venta.dbf'), FIELDS, ROWS, deleted=[4])
+    return tmp_path
+
+
+@pytest.fixture
+def venta_indexed(venta):
+    # The index keeps the key of the deleted record, like FoxPro does
+    entries = sorted((encode_key(number, KEY_NUMERIC, 8, 'cp850'), recno)
+                     for recno, (number, _, _) in enumerate(ROWS, start=1))
+    write_cdx(str(venta / 'venta.cdx'), [('NO_REFEREN', 'NO_REFEREN', 8, key_pad(KEY_NUMERIC), entries)])
+    return venta
+
+
+def test_key_tokens_compare_numbers_by_value_and_text_as_is(venta):
+    reader = DBFReader(str(venta), encrypted=False, backend='raw')
+
+    assert reader._key_token('287732', True) == reader._key_token(Decimal('287732.00'), True) == \
+        reader._key_token(287732, True)
+    assert reader._key_token('00123', False) != reader._key_token('123', False)
+    assert reader._typed_keys(['2', 2, Decimal('2.0'), '2.5', 'x'], True) == {'2': 2, '2.5': 2.5}
+
+
+def test_lookup_without_index_scans_and_keeps_character_keys_apart(venta):
+    reader = DBFReader(str(venta), encrypted=False, backend='raw')
+
+    assert [record['NO_REFEREN'] for record in reader.lookup_keys('VENTA', 'FOLIO', ['123'])] == [1]
+    records = reader.lookup_keys('VENTA', 'no_referen', ['2', 3, 'x'],
+                                 filters=[{'field': 'TIPO_DOC', 'operator': '=', 'value': 'FA'}])
+    assert [record['FOLIO'] for record in records] == ['00123', '00124']
+
+
+def test_lookup_seeks_the_cdx_tag(venta_indexed, monkeypatch):
+    def no_scan(*args, **kwargs):
+        raise AssertionError("the lookup scanned the table")
+    monkeypatch.setattr(RawDBFReader, 'iter_records', no_scan)
+    reader = DBFReader(str(venta_indexed), encrypted=False, backend='raw')
+
+    records = reader.lookup_keys('VENTA', 'NO_REFEREN', ['4', Decimal('2.00'), 3, 'x', 2])
+    assert [(record['NO_REFEREN'], record['FOLIO']) for record in records] == \
+        [(2, '00124'), (2, '00125'), (3, '00123')]
+    records = reader.lookup_keys('VENTA', 'NO_REFEREN', [2, 3],
+                                 filters=[{'field': 'TIPO_DOC', 'operator': '=', 'value': 'NC'}])
+    assert [record['FOLIO'] for record in records] == ['00125']
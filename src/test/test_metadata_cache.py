@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.cdx import KEY_CHARACTER, key_pad
+from src.dbf_enc_reader.metadata_cache import TableMetadataCache
+from src.test.dbf_fixtures import write_cdx, write_dbf
+
+FIELDS = [('TIPO_DOC', 'C', 3, 0), ('NO_REFEREN', 'N', 8, 0)]
+ROWS = [('FA', 1), ('NC', 2), ('FA', 3)]
+
+
+@pytest.fixture
+def venta(tmp_path):
+    data = tmp_path / 'data'
+    data.mkdir()
+    write_dbf(str(data / 'VENTA.DBF'), FIELDS, ROWS)
+    return data
+
+
+@pytest.fixture
+def describes(monkeypatch):
+    calls = []
+    describe = TableMetadataCache._describe
+
+    def counting(dbf_path, cdx_path):
+        calls.append(dbf_path)
+        return describe(dbf_path, cdx_path)
+    monkeypatch.setattr(TableMetadataCache, '_describe', staticmethod(counting))
+    return calls
+
+
+def _write_tags(path, *names):
+    write_cdx(str(path), [(name, name, 3, key_pad(KEY_CHARACTER), [(b'FA', 1)]) for name in names])
+
+
+def test_unchanged_table_is_served_from_the_cache(venta, tmp_path, describes):
+    cache_path = str(tmp_path / 'cache.json')
+    cache = TableMetadataCache(cache_path)
+
+    metadata = cache.get(str(venta), 'venta')
+    assert metadata['record_count'] == 3
+    assert [field['name'] for field in metadata['fields']] == ['TIPO_DOC', 'NO_REFEREN']
+    assert cache.get(str(venta), 'VENTA.DBF') == metadata
+    # A new process reuses the persisted entry
+    assert TableMetadataCache(cache_path).get(str(venta), 'VENTA') == metadata
+    assert len(describes) == 1
+
+
+def test_header_change_with_same_size_and_mtime_is_detected(venta, tmp_path, describes):
+    cache = TableMetadataCache(str(tmp_path / 'cache.json'))
+    cache.get(str(venta), 'VENTA')
+
+    path = venta / 'VENTA.DBF'
+    stat = os.stat(path)
+    with open(path, 'r+b') as f:
+        f.seek(4)
+        f.write((2).to_bytes(4, 'little'))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache.get(str(venta), 'VENTA')['record_count'] == 2
+    assert len(describes) == 2
+
+
+def test_cdx_change_refreshes_the_tags(venta, tmp_path, describes):
+    cache = TableMetadataCache(str(tmp_path / 'cache.json'))
+    _write_tags(venta / 'VENTA.CDX', 'TIPO_DOC')
+    assert [tag['name'] for tag in cache.get(str(venta), 'VENTA')['cdx_tags']] == ['TIPO_DOC']
+
+    _write_tags(venta / 'VENTA.CDX', 'TIPO_DOC', 'TIPO_DOC2')
+    assert [tag['name'] for tag in cache.get(str(venta), 'VENTA')['cdx_tags']] == ['TIPO_DOC', 'TIPO_DOC2']
+
+    os.remove(venta / 'VENTA.CDX')
+    assert cache.get(str(venta), 'VENTA')['cdx_tags'] == []
+    assert len(describes) == 3
+
+
+def test_missing_table_is_not_cached(venta, tmp_path):
+    cache = TableMetadataCache(str(tmp_path / 'cache.json'))
+    cache.get(str(venta), 'VENTA')
+    os.remove(venta / 'VENTA.DBF')
+
+    assert cache.get(str(venta), 'VENTA') is None
+    assert cache.get(str(venta), 'NOTA') is None
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dbf_enc_reader import ordering
+from src.dbf_enc_reader.ordering import external_sort, make_sort_key, merge_sorted
+
+
+def test_external_sort_bounds_open_runs(tmp_path, monkeypatch):
+    open_runs = []
+    most_open = []
+    read_run = ordering._read_run
+
+    def tracking_read_run(path):
+        open_runs.append(path)
+        most_open.append(len(open_runs))
+        try:
+            yield from read_run(path)
+        finally:
+            open_runs.remove(path)
+
+    monkeypatch.setattr(ordering, '_read_run', tracking_read_run)
+    records = [{'N': (i * 7919) % 1000, 'I': i} for i in range(1000)]
+    key = make_sort_key(['N'])
+
+    result = list(external_sort(records, key, max_in_memory=10, tmp_dir=str(tmp_path), max_fan_in=4))
+
+    assert [record['N'] for record in result] == sorted(record['N'] for record in records)
+    assert max(most_open) <= 4
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_sort_is_stable_across_merge_passes(tmp_path):
+    records = [{'N': i % 3, 'I': i} for i in range(200)]
+
+    result = list(external_sort(records, make_sort_key(['N']), max_in_memory=7, tmp_dir=str(tmp_path), max_fan_in=3))
+
+    assert result == sorted(records, key=lambda record: record['N'])
+
+
+def test_dates_sort_chronologically_and_merge_dedups():
+    key = make_sort_key(['F'])
+    first = [{'F': '05/01/2024', 'ID': 1}, {'F': '01/03/2024', 'ID': 2}]
+    second = [{'F': '15/01/2024', 'ID': 3}, {'F': '01/03/2024', 'ID': 2}]
+
+    merged = list(merge_sorted([first, second], key, dedup_key=make_sort_key(['ID'])))
+
+    assert [record['ID'] for record in merged] == [1, 3, 2]
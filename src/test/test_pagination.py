@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.pagination import PageCursor, filter_signature
+from src.filters.expressions import compile_expression
+from src.test.dbf_fixtures import write_dbf
+
+FIELDS = [('TIPO_DOC', 'C', 3, 0), ('NO_REFEREN', 'N', 8, 0)]
+ROWS = [('FA' if n % 4 else 'NC', n) for n in range(1, 21)]
+FA_ONLY = [{'field': 'TIPO_DOC', 'operator': '=', 'value': 'FA'}]
+
+
+def _read_all(reader, table_name, page_size, filters=None):
+    pages, cursor = [], None
+    while True:
+        page, cursor = reader.read_page(table_name, page_size, cursor, filters)
+        pages.append([record['NO_REFEREN'] for record in page])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trips_through_its_token():
+    cursor = PageCursor('VENTA', 1234, filter_signature(FA_ONLY))
+
+    token = cursor.encode()
+    assert '=' not in token
+    assert PageCursor.decode(token) == cursor
+    cursor.check('venta', [dict(FA_ONLY[0])])
+
+
+def test_cursor_is_signed_with_its_filters():
+    expression = [{'operator': 'expression', 'expression': compile_expression("TIPO_DOC = 'FA'")}]
+
+    assert filter_signature(None) == filter_signature([]) == ''
+    assert filter_signature(expression) == \
+        filter_signature([{'operator': 'expression', 'expression': compile_expression("TIPO_DOC = 'FA'")}])
+    assert filter_signature(expression) != \
+        filter_signature([{'operator': 'expression', 'expression': compile_expression("TIPO_DOC = 'NC'")}])
+
+
+def test_cursor_for_another_table_or_filters_is_rejected():
+    cursor = PageCursor('VENTA', 10, filter_signature(FA_ONLY))
+
+    with pytest.raises(ValueError):
+        cursor.check('NOTA', FA_ONLY)
+    with pytest.raises(ValueError):
+        cursor.check('VENTA', [{'field': 'TIPO_DOC', 'operator': '=', 'value': 'NC'}])
+    with pytest.raises(ValueError):
+        cursor.check('VENTA', None)
+
+
+@pytest.mark.parametrize('token', ['', 'not a cursor', 'eyJ0IjoiVkVOVEEifQ', '!!!!'])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(ValueError):
+        PageCursor.decode(token)
+
+
+def test_pages_cover_the_table_once_and_end_with_no_cursor(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    write_dbf(str(tmp_path / 'venta.dbf'), FIELDS, ROWS, deleted=[1, 9])
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+
+    pages = _read_all(reader, 'VENTA', 6, FA_ONLY)
+
+    # 15 FA rows, two of them deleted; the last full page is not followed by an empty one
+    expected = [n for n in range(1, 21) if n % 4 and n not in (2, 10)]
+    assert [n for page in pages for n in page] == expected
+    assert [len(page) for page in pages] == [6, 6, 1]
+    assert _read_all(reader, 'VENTA', 13, FA_ONLY) == [expected]
+
+    with pytest.raises(ValueError):
+        reader.read_page('VENTA', 6, PageCursor('VENTA', 6, '').encode(), FA_ONLY)
+
+
+def test_rows_deleted_between_pages_do_not_shift_later_pages(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    path = str(tmp_path / 'venta.dbf')
+    write_dbf(path, FIELDS, ROWS)
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+
+    first, cursor = reader.read_page('VENTA', 5, None, FA_ONLY)
+    assert [record['NO_REFEREN'] for record in first] == [1, 2, 3, 5, 6]
+
+    # Rows on the first page are deleted and another one stops matching the filter
+    rows = list(ROWS)
+    rows[6] = ('NC', 7)
+    write_dbf(path, FIELDS, rows, deleted=[0, 1, 2])
+
+    second, cursor = reader.read_page('VENTA', 5, cursor, FA_ONLY)
+    assert [record['NO_REFEREN'] for record in second] == [9, 10, 11, 13, 14]
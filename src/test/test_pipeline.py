@@ -0,0 +1,84 @@
+import sys
+import os
+import threading
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.pipeline import ExtractionPipeline, batched
+from src.test.dbf_fixtures import write_dbf
+
+
+def _pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name in ('dbf-read', 'dbf-convert')]
+
+
+def test_batched_keeps_a_partial_last_batch():
+    assert list(batched(iter(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched(iter(range(6)), 3)) == [[0, 1, 2], [3, 4, 5]]
+    assert list(batched(iter([]), 3)) == []
+
+
+def test_counts_rows_and_batches_per_stage():
+    received = []
+    pipeline = ExtractionPipeline(lambda: batched(iter(range(10)), 4),
+                                  lambda batch: [{'N': n} for n in batch if n % 2 == 0],
+                                  received.extend, queue_size=1)
+
+    result = pipeline.run()
+
+    assert received == [{'N': n} for n in (0, 2, 4, 6, 8)]
+    assert result['rows'] == 5
+    stages = {stage['stage']: stage for stage in result['stages']}
+    assert (stages['read']['batches'], stages['read']['rows']) == (3, 10)
+    assert (stages['convert']['batches'], stages['convert']['rows']) == (3, 5)
+    assert (stages['sink']['batches'], stages['sink']['rows']) == (3, 5)
+
+
+@pytest.mark.parametrize('failing_stage', ['produce', 'convert', 'sink'])
+def test_stage_errors_are_raised_after_the_threads_stop(failing_stage):
+    closed = []
+
+    def produce():
+        try:
+            for n in range(1000):
+                if failing_stage == 'produce' and n == 5:
+                    raise OSError("share went away")
+                yield [n]
+        finally:
+            closed.append(True)
+
+    def convert(batch):
+        if failing_stage == 'convert' and batch[0] == 5:
+            raise ValueError("bad value")
+        return [{'N': n} for n in batch]
+
+    def sink(records):
+        if failing_stage == 'sink' and records[0]['N'] == 5:
+            raise RuntimeError("disk full")
+
+    expected = {'produce': OSError, 'convert': ValueError, 'sink': RuntimeError}[failing_stage]
+    with pytest.raises(expected):
+        ExtractionPipeline(produce, convert, sink, queue_size=2).run()
+
+    assert closed == [True]
+    assert _pipeline_threads() == []
+
+
+def test_extract_pipelined_filters_and_skips_deleted_rows(tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    fields = [('TIPO_DOC', 'C', 3, 0), ('NO_REFEREN', 'N', 8, 0), ('TOTAL_BRUT', 'N', 10, 2)]
+    rows = [('FA' if n % 3 else 'NC', n, Decimal(n) / 4) for n in range(1, 51)]
+    write_dbf(str(tmp_path / 'venta.dbf'), fields, rows, deleted=[1, 4, 28])
+    reader = DBFReader(str(tmp_path), encrypted=False, backend='raw')
+    received = []
+
+    result = reader.extract_pipelined('VENTA', received.extend,
+                                      [{'field': 'TIPO_DOC', 'operator': '=', 'value': 'FA'}],
+                                      ['no_referen'], batch_size=7)
+
+    expected = [n for n in range(1, 51) if n % 3 and n not in (2, 5, 29)]
+    assert [record['NO_REFEREN'] for record in received] == expected
+    assert set(received[0]) == {'NO_REFEREN'}
+    assert result['rows'] == len(expected)
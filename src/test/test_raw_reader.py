@@ -0,0 +1,127 @@
+import sys
+import os
+import json
+from datetime import date
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.converters import DataConverter
+from src.dbf_enc_reader.raw_reader import RawDBFReader, resolve_table_file
+from src.test.dbf_fixtures import write_dbf
+
+FIELDS = [('TIPO_DOC', 'C', 3, 0), ('NO_REFEREN', 'N', 8, 0), ('F_EMISION', 'D', 8, 0),
+          ('TOTAL_BRUT', 'N', 10, 2), ('CLIENTE', 'C', 12, 0), ('PAGADO', 'L', 1, 0)]
+ROWS = [
+    ('FA', 1, date(2025, 9, 24), Decimal('12.50'), 'Peña', True),
+    ('NC', 2, date(2025, 9, 25), Decimal('3.10'), 'CLI2', False),
+    ('FA', 3, None, None, '', None),
+]
+
+
+@pytest.fixture
+def venta(tmp_path):
+    write_dbf(str(tmp_path / 'venta.dbf'), FIELDS, ROWS)
+    return tmp_path
+
+
+def test_header_and_field_descriptors(venta):
+    with RawDBFReader(str(venta / 'venta.dbf')) as raw:
+        assert raw.record_count == 3
+        assert raw.field_names() == [name for name, _, _, _ in FIELDS]
+        assert raw.codepage == 'cp850'
+        assert [(f.type, f.length, f.decimals) for f in raw.fields][3] == ('N', 10, 2)
+
+
+def test_decodes_every_field_type(venta):
+    with RawDBFReader(str(venta / 'venta.dbf')) as raw:
+        records = list(raw.iter_records())
+
+    assert records[0] == (1, {'TIPO_DOC': 'FA', 'NO_REFEREN': 1, 'F_EMISION': '24/09/2025',
+                              'TOTAL_BRUT': Decimal('12.50'), 'CLIENTE': 'Peña', 'PAGADO': True})
+    assert records[2] == (3, {'TIPO_DOC': 'FA', 'NO_REFEREN': 3, 'F_EMISION': None,
+                              'TOTAL_BRUT': None, 'CLIENTE': '', 'PAGADO': None})
+
+
+def test_amounts_are_decimal_like_the_advantage_provider(venta):
+    with RawDBFReader(str(venta / 'venta.dbf')) as raw:
+        totals = [record['TOTAL_BRUT'] for _, record in raw.iter_records(['total_brut'])]
+
+    assert totals == [Decimal('12.50'), Decimal('3.10'), None]
+    assert all(isinstance(total, Decimal) for total in totals[:2])
+
+
+def test_to_json_writes_amounts_with_their_exact_digits(venta):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    reader = DBFReader(str(venta), encrypted=False, backend='raw')
+
+    records = json.loads(reader.to_json('VENTA', limit=2))
+
+    assert [record['TOTAL_BRUT'] for record in records] == ['12.50', '3.10']
+    assert records[0]['CLIENTE'] == 'Peña'
+
+
+def test_projection_and_start_record(venta):
+    with RawDBFReader(str(venta / 'venta.dbf')) as raw:
+        assert list(raw.iter_records(['no_referen'], start_recno=2, batch_size=1)) == \
+            [(2, {'NO_REFEREN': 2}), (3, {'NO_REFEREN': 3})]
+        with pytest.raises(ValueError):
+            raw.select_fields(['MISSING'])
+
+
+def test_code_page_from_language_driver(tmp_path):
+    path = str(tmp_path / 'clientes.dbf')
+    write_dbf(path, [('NOMBRE', 'C', 10, 0)], [('Ñandú',), ('Café',)], language_driver=0x03, codepage='cp1252')
+
+    with RawDBFReader(path) as raw:
+        assert raw.codepage == 'cp1252'
+        assert [record['NOMBRE'] for _, record in raw.iter_records()] == ['Ñandú', 'Café']
+
+    # An explicit code page overrides the header
+    with RawDBFReader(path, codepage='cp850') as raw:
+        assert [record['NOMBRE'] for _, record in raw.iter_records()] == \
+            [value.encode('cp1252').decode('cp850') for value in ('Ñandú', 'Café')]
+
+
+def test_decode_text_batch_paths():
+    converter = DataConverter()
+
+    assert converter.decode_text_batch([b'FA', b'', b'NC'], 'cp850') == ['FA', '', 'NC']
+    assert converter.decode_text_batch(['Peña'.encode('cp850'), b'CLI'], 'cp850') == ['Peña', 'CLI']
+    # Embedded NUL bytes can't use the joined split
+    assert converter.decode_text_batch([b'A\x00B', 'ñ'.encode('cp850')], 'cp850') == ['A\x00B', 'ñ']
+    assert converter.decode_text_batch(['日本'.encode('cp932'), b'X'], 'cp932') == ['日本', 'X']
+
+
+def test_resolve_table_file_ignores_case(venta):
+    assert resolve_table_file(str(venta), 'VENTA') == str(venta / 'venta.dbf')
+    assert resolve_table_file(str(venta), 'venta.DBF') == str(venta / 'venta.dbf')
+    assert resolve_table_file(str(venta), 'VENTA', '.CDX') is None
+
+
+@pytest.fixture
+def venta_deleted(tmp_path):
+    path = str(tmp_path / 'venta.dbf')
+    write_dbf(path, FIELDS, ROWS, deleted=[1])
+    return path
+
+
+def test_deleted_records_are_skipped(venta_deleted):
+    with RawDBFReader(venta_deleted) as raw:
+        assert [recno for recno, _ in raw.iter_records(['no_referen'])] == [1, 3]
+        assert [recno for recno, _ in raw.iter_records(['no_referen'], batch_size=1)] == [1, 3]
+        assert [recno for recno, _ in raw.iter_records(['no_referen'], deleted=None)] == [1, 2, 3]
+
+
+def test_read_record_of_a_deleted_record_is_none(venta_deleted):
+    with RawDBFReader(venta_deleted) as raw:
+        assert raw.read_record(2) is None
+        assert raw.read_record(3, ['no_referen']) == {'NO_REFEREN': 3}
+        assert raw.read_record(4) is None
+
+
+def test_tombstones_are_the_deleted_records(venta_deleted):
+    with RawDBFReader(venta_deleted) as raw:
+        assert list(raw.iter_records(['tipo_doc', 'no_referen'], deleted=True)) == \
+            [(2, {'TIPO_DOC': 'NC', 'NO_REFEREN': 2})]
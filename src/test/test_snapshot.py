@@ -0,0 +1,129 @@
+import sys
+import os
+import random
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from src.dbf_enc_reader.snapshot import ReadAheadFile, TableSnapshot
+from src.test.dbf_fixtures import write_dbf
+
+FIELDS = [('NO_REFEREN', 'N', 8, 0)]
+
+
+@pytest.fixture
+def share(tmp_path):
+    source = tmp_path / 'share'
+    source.mkdir()
+    write_dbf(str(source / 'VENTA.DBF'), FIELDS, [(n,) for n in range(1, 11)])
+    (source / 'VENTA.CDX').write_bytes(b'index')
+    return source
+
+
+@pytest.fixture
+def copies(monkeypatch):
+    copied = []
+    copy_file = TableSnapshot._copy_file
+
+    def counting(self, source, target):
+        copied.append(os.path.basename(source))
+        copy_file(self, source, target)
+    monkeypatch.setattr(TableSnapshot, '_copy_file', counting)
+    return copied
+
+
+def _append_row(path, number):
+    write_dbf(str(path), FIELDS, [(n,) for n in range(1, number + 1)])
+
+
+def test_unchanged_table_reuses_its_copy(share, tmp_path, copies):
+    snapshot = TableSnapshot(str(share), str(tmp_path / 'local'))
+
+    first = snapshot.create('venta')
+    assert sorted(os.listdir(first)) == ['VENTA.CDX', 'VENTA.DBF']
+    assert TableSnapshot(str(share), str(tmp_path / 'local')).create('VENTA.DBF') == first
+    assert sorted(copies) == ['VENTA.CDX', 'VENTA.DBF']
+
+
+def test_held_copy_survives_newer_snapshots_until_released(share, tmp_path, copies):
+    snapshot = TableSnapshot(str(share), str(tmp_path / 'local'))
+    first = snapshot.create('VENTA')
+    _append_row(share / 'VENTA.DBF', 11)
+
+    second = snapshot.create('VENTA')
+    assert second != first
+    assert os.path.getsize(os.path.join(first, 'VENTA.DBF')) < os.path.getsize(os.path.join(second, 'VENTA.DBF'))
+
+    snapshot.release(first)
+    snapshot.release(second)
+    # Only the latest copy is kept for the next reader
+    assert not os.path.exists(first)
+    assert snapshot.create('VENTA') == second
+
+
+def test_copy_is_retried_when_the_table_changes_meanwhile(share, tmp_path, monkeypatch):
+    snapshot = TableSnapshot(str(share), str(tmp_path / 'local'), retry_delay=0)
+    copy_file = TableSnapshot._copy_file
+    calls = []
+
+    def racing(self, source, target):
+        calls.append(source)
+        if len(calls) == 1:
+            _append_row(share / 'VENTA.DBF', 12)
+        copy_file(self, source, target)
+    monkeypatch.setattr(TableSnapshot, '_copy_file', racing)
+
+    directory = snapshot.create('VENTA')
+    with open(os.path.join(directory, 'VENTA.DBF'), 'rb') as copy, open(share / 'VENTA.DBF', 'rb') as source:
+        assert copy.read() == source.read()
+    assert len(calls) == 4
+
+
+def test_table_changing_on_every_attempt_fails_without_leftovers(share, tmp_path, monkeypatch):
+    local = tmp_path / 'local'
+    snapshot = TableSnapshot(str(share), str(local), retries=2, retry_delay=0)
+    copy_file = TableSnapshot._copy_file
+    rows = [10]
+
+    def always_racing(self, source, target):
+        rows[0] += 1
+        _append_row(share / 'VENTA.DBF', rows[0])
+        copy_file(self, source, target)
+    monkeypatch.setattr(TableSnapshot, '_copy_file', always_racing)
+
+    with pytest.raises(RuntimeError):
+        snapshot.create('VENTA')
+    assert [entry.name for entry in os.scandir(snapshot.local_dir) if entry.is_dir()] == []
+
+
+def test_read_ahead_file_matches_the_file_at_any_offset(tmp_path):
+    data = bytes(random.Random(7).getrandbits(8) for _ in range(10000))
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+
+    with ReadAheadFile(str(path), block_size=256, read_ahead=2, max_blocks=4) as f:
+        for offset, size in ((0, 10), (9000, 600), (255, 2), (4000, 1), (9990, 50), (10000, 5), (12000, 5), (1, -1)):
+            f.seek(offset)
+            expected = data[offset:] if size < 0 else data[offset:offset + size]
+            assert f.read(size) == expected
+            assert f.tell() == offset + len(expected)
+        f.seek(-3, os.SEEK_END)
+        assert f.read() == data[-3:]
+        assert len(f.blocks) <= 4
+        assert f.hits and f.misses
+
+
+def test_reader_keeps_its_snapshot_until_refreshed(share, tmp_path):
+    DBFReader = pytest.importorskip('src.dbf_enc_reader.core').DBFReader
+    with DBFReader(str(share), encrypted=False, backend='raw', snapshot=True,
+                   snapshot_dir=str(tmp_path / 'local')) as reader:
+        page, cursor = reader.read_page('VENTA', 4)
+        _append_row(share / 'VENTA.DBF', 15)
+        rows = page
+        while cursor:
+            page, cursor = reader.read_page('VENTA', 4, cursor)
+            rows += page
+        assert [row['NO_REFEREN'] for row in rows] == list(range(1, 11))
+
+        reader.refresh_snapshots('VENTA')
+        assert len(reader.read_table('VENTA')) == 15
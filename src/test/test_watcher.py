@@ -0,0 +1,157 @@
+import sys
+import os
+import queue
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dbf_enc_reader import watcher
+from src.dbf_enc_reader.watcher import CombinedSource, PollingSource, TableWatcher, filesystem_type
+
+MOUNTS = """\
+/dev/sda1 / ext4 rw,relatime 0 0
+//server/datos /mnt/sucursales cifs rw,vers=3.0 0 0
+server:/export /mnt/sucursales/norte nfs4 rw 0 0
+//server/con\\040espacio /mnt/con\\040espacio cifs rw 0 0
+"""
+
+
+def test_filesystem_type_uses_the_deepest_mount(tmp_path, monkeypatch):
+    mounts = tmp_path / 'mounts'
+    mounts.write_text(MOUNTS)
+    monkeypatch.setattr(os.path, 'realpath', lambda path: path)
+
+    assert filesystem_type('/var/data', str(mounts)) == 'ext4'
+    assert filesystem_type('/mnt/sucursales/sur', str(mounts)) == 'cifs'
+    assert filesystem_type('/mnt/sucursales/norte/2025', str(mounts)) == 'nfs4'
+    assert filesystem_type('/mnt/con espacio', str(mounts)) == 'cifs'
+    assert filesystem_type('/mnt/sucursales2', str(mounts)) == 'ext4'
+
+
+def test_network_directories_are_polled_next_to_inotify(tmp_path, monkeypatch):
+    local, remote = tmp_path / 'local', tmp_path / 'remote'
+    local.mkdir()
+    remote.mkdir()
+    monkeypatch.setattr(watcher, 'is_network_filesystem', lambda directory: directory == str(remote))
+
+    source = TableWatcher([str(local), str(remote)], ['VENTA'], lambda d, t: None, poll_interval=0.01)._open_source()
+    try:
+        assert isinstance(source, CombinedSource)
+        polling = source.sources[-1]
+        assert isinstance(polling, PollingSource) and polling.directories == [str(remote)]
+
+        (remote / 'VENTA.DBF').write_bytes(b'written by another host')
+        changed = []
+        for _ in range(50):
+            changed = source.wait(0.05)
+            if changed:
+                break
+        assert changed == [(str(remote), 'VENTA')]
+    finally:
+        source.close()
+
+
+class QueuedSource:
+    """Change source fed by the test instead of the filesystem."""
+
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def wait(self, timeout):
+        try:
+            changed = [self.events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while not self.events.empty():
+            changed.append(self.events.get())
+        return changed
+
+    def close(self):
+        pass
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _start(tmp_path, monkeypatch, on_change, **options):
+    (tmp_path / 'VENTA.DBF').write_bytes(b'0')
+    source = QueuedSource()
+    monkeypatch.setattr(TableWatcher, '_open_source', lambda self: source)
+    table_watcher = TableWatcher([str(tmp_path)], ['VENTA'], on_change, poll_interval=0.05, **options)
+    table_watcher.start()
+
+    def write(size):
+        (tmp_path / 'VENTA.DBF').write_bytes(b'0' * size)
+        source.events.put((str(tmp_path), 'VENTA'))
+    return table_watcher, source, write
+
+
+def test_burst_of_writes_is_handled_once(tmp_path, monkeypatch):
+    calls = []
+    table_watcher, _, write = _start(tmp_path, monkeypatch, lambda d, t: calls.append(t), debounce=0.2)
+    with table_watcher:
+        for size in range(2, 7):
+            write(size)
+            time.sleep(0.02)
+        _wait_for(lambda: calls)
+        time.sleep(0.4)
+    assert calls == ['VENTA']
+
+
+def test_event_without_file_change_is_skipped(tmp_path, monkeypatch):
+    calls = []
+    table_watcher, source, write = _start(tmp_path, monkeypatch, lambda d, t: calls.append(t), debounce=0.05)
+    with table_watcher:
+        source.events.put((str(tmp_path), 'VENTA'))
+        time.sleep(0.3)
+        assert calls == []
+        write(2)
+        _wait_for(lambda: calls == ['VENTA'])
+        # The same files again are not re-extracted
+        source.events.put((str(tmp_path), 'VENTA'))
+        time.sleep(0.3)
+    assert calls == ['VENTA']
+
+
+def test_table_is_never_handled_twice_at_once(tmp_path, monkeypatch):
+    release = threading.Event()
+    running, overlaps, calls = [], [], []
+
+    def on_change(directory, table):
+        overlaps.append(len(running))
+        running.append(table)
+        calls.append(table)
+        release.wait(5)
+        running.remove(table)
+
+    table_watcher, _, write = _start(tmp_path, monkeypatch, on_change, debounce=0.05, max_workers=2)
+    with table_watcher:
+        write(2)
+        _wait_for(lambda: running)
+        # Written again while the first run is still going
+        write(3)
+        time.sleep(0.3)
+        assert calls == ['VENTA']
+        release.set()
+        _wait_for(lambda: len(calls) == 2)
+    assert overlaps == [0, 0]
+
+
+def test_failed_table_is_retried_without_another_write(tmp_path, monkeypatch):
+    calls = []
+
+    def on_change(directory, table):
+        calls.append(table)
+        if len(calls) == 1:
+            raise IOError("share went away")
+
+    table_watcher, _, write = _start(tmp_path, monkeypatch, on_change, debounce=0.05, retry_delay=0.1)
+    with table_watcher:
+        write(2)
+        _wait_for(lambda: len(calls) == 2)
+        time.sleep(0.3)
+    assert calls == ['VENTA', 'VENTA']